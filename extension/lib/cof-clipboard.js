@@ -16,6 +16,29 @@
     }
   }
 
+  // Test-only: with debug logs enabled, record lengths and marker flags of the payload last
+  // handed to the clipboard so the harness can verify a copy without reading the OS clipboard.
+  function noteWrite(mode, html, text) {
+    if (!cof.debugEnabled?.()) return;
+    try {
+      diag(
+        "clipboardLastWrite",
+        JSON.stringify({
+          mode,
+          htmlLen: html.length,
+          textLen: text.length,
+          omml: /mso-element:omath|<m:omath/i.test(html),
+          mathml: /http:\/\/www\.w3\.org\/1998\/Math\/MathML/i.test(html),
+          parseError: /\[PARSE ERROR:/i.test(html),
+          wordWrapped: /^\s*<!doctype html|urn:schemas-microsoft-com:office:office/i.test(html),
+          markdown: /# |\* |- |`/.test(text) || (text.includes("\n") && text.length > 50),
+        }),
+      );
+    } catch (_e) {
+      // Diagnostics only.
+    }
+  }
+
   async function bgSend(payload) {
     try {
       if (!core.browserApi?.runtime?.sendMessage) return null;
@@ -32,6 +55,7 @@
     // nested <html>/<body> and has been observed to behave poorly in some paste targets.
     const fragmentHtml = String(html || "");
     dbg("writeHtml:start", { htmlLen: fragmentHtml.length, textLen: String(text || "").length });
+    noteWrite("html", fragmentHtml, String(text || ""));
     
     if (navigator?.clipboard?.write && typeof ClipboardItem !== "undefined") {
       try {
@@ -65,6 +89,7 @@
     const exactHtml = String(html || "");
     const t = String(text || "");
     dbg("writeHtmlExact:start", { htmlLen: exactHtml.length, textLen: t.length });
+    noteWrite("html-exact", exactHtml, t);
 
     if (navigator?.clipboard?.write && typeof ClipboardItem !== "undefined") {
       try {
@@ -97,6 +122,7 @@
   async function writeText(text) {
     const t = String(text || "");
     dbg("writeText:start", { textLen: t.length });
+    noteWrite("text", "", t);
 
     if (navigator?.clipboard?.writeText) {
       try {
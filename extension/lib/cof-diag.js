@@ -35,5 +35,6 @@
   };
   globalThis.__cofDiag = diag;
   cof.diag = diag;
+  cof.debugEnabled = shouldLogDebug;
   if (ds) ds.copyOfficeFormatExtensionLoaded = "true";
 })();
@@ -46,6 +46,47 @@ def _run_step(*, name: str, argv: list[str], cwd: Path, env: dict[str, str] | No
     return StepResult(name=name, status="FAIL", rc=proc.returncode)
 
 
+def _run_steps_parallel(*, steps: list[tuple[str, list[str]]], cwd: Path, jobs: int) -> list[StepResult]:
+    """
+    Run independent steps concurrently (at most `jobs` at a time).
+
+    Each step's output is captured and printed as one block, in the order given, so the log reads
+    the same as a sequential run.
+    """
+    pending = list(steps)
+    running: list[tuple[str, list[str], subprocess.Popen[str]]] = []
+    results: list[StepResult] = []
+
+    def launch() -> None:
+        while pending and len(running) < max(1, jobs):
+            name, argv = pending.pop(0)
+            proc = subprocess.Popen(
+                argv,
+                cwd=str(cwd),
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+                errors="replace",
+            )
+            running.append((name, argv, proc))
+
+    launch()
+    while running:
+        name, argv, proc = running.pop(0)
+        out, _ = proc.communicate()
+        launch()
+        print("\n" + "=" * 70)
+        print(f"[step] {name}")
+        print("=" * 70)
+        print(" ".join(argv))
+        print("")
+        if out:
+            print(out, end="" if out.endswith("\n") else "\n")
+        status = "PASS" if proc.returncode == 0 else "FAIL"
+        results.append(StepResult(name=name, status=status, rc=proc.returncode))
+    return results
+
+
 def _has_chromium_popup(dist_dir: Path) -> bool:
     try:
         return (dist_dir / "popup.html").exists()
@@ -62,6 +103,12 @@ def main(argv: list[str]) -> int:
     parser.add_argument("--with-edge-cases", action="store_true", help="Run Playwright edge-case suite (slower).")
     parser.add_argument("--with-popup", action="store_true", help="Run popup UI suite (may be skipped on Chromium MV3 builds without popup files).")
     parser.add_argument("--fail-fast", action="store_true", help="Stop on first failing test step (after prerequisites).")
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=4,
+        help="Max concurrent unit-test steps (pure-Python/Node, no browser or clipboard). Use 1 to run them serially.",
+    )
     parser.add_argument(
         "--fast",
         action="store_true",
@@ -98,16 +145,6 @@ def main(argv: list[str]) -> int:
         if results[-1].status == "FAIL":
             return results[-1].rc
 
-        note_result(
-            _run_step(
-                name="Translation WASM smoke (no network)",
-                argv=["node", "tests/test_translation_wasm_smoke.js"],
-                cwd=PROJECT_ROOT,
-            )
-        )
-        if results[-1].status == "FAIL" and args.fail_fast:
-            return results[-1].rc
-
     if not args.skip_js_size:
         note_result(
             _run_step(
@@ -119,106 +156,36 @@ def main(argv: list[str]) -> int:
         if results[-1].status == "FAIL":
             return results[-1].rc
 
+    # Short no-network checks share no browser, clipboard or output files, so they are collected
+    # into one batch and overlapped; a failing step still stops the run under --fail-fast, after
+    # the batch has finished.
+    unit_steps: list[tuple[str, list[str]]] = []
+    if not args.skip_build_wasm:
+        unit_steps.append(("Translation WASM smoke (no network)", ["node", "tests/test_translation_wasm_smoke.js"]))
     if not args.skip_translation_unit:
-        note_result(
-            _run_step(
-                name="Translation unit tests (no network keys)",
-                argv=[py, "tests/run_translation_tests.py"],
-                cwd=PROJECT_ROOT,
-            )
-        )
-        if results[-1].status == "FAIL" and args.fail_fast:
-            return results[-1].rc
-
-        note_result(
-            _run_step(
-                name="Node: google-free chunking (mocked, no network)",
-                argv=["node", "tests/test_translation_google_free_chunking.js"],
-                cwd=PROJECT_ROOT,
-            )
-        )
-        if results[-1].status == "FAIL" and args.fail_fast:
-            return results[-1].rc
-
-        note_result(
-            _run_step(
-                name="Node: paid google chunking (mocked, no network)",
-                argv=["node", "tests/test_translation_chunking_paid_google.js"],
-                cwd=PROJECT_ROOT,
-            )
-        )
-        if results[-1].status == "FAIL" and args.fail_fast:
-            return results[-1].rc
-
-        note_result(
-            _run_step(
-                name="Node: LLM marker integrity (mocked, no network)",
-                argv=["node", "tests/test_translation_integrity_llm_markers.js"],
-                cwd=PROJECT_ROOT,
-            )
-        )
-        if results[-1].status == "FAIL" and args.fail_fast:
-            return results[-1].rc
-
-        note_result(
-            _run_step(
-                name="Node: anchor restore independent of order",
-                argv=["node", "tests/test_anchor_restore_marker_order.js"],
-                cwd=PROJECT_ROOT,
-            )
-        )
-        if results[-1].status == "FAIL" and args.fail_fast:
-            return results[-1].rc
-
-        note_result(
-            _run_step(
-                name="Node: selection multi-range dedupe",
-                argv=["node", "tests/test_selection_multirange_dedupe.js"],
-                cwd=PROJECT_ROOT,
-            )
-        )
-        if results[-1].status == "FAIL" and args.fail_fast:
-            return results[-1].rc
-
-        note_result(
-            _run_step(
-                name="Node: pollinations is serialized (mocked, no network)",
-                argv=["node", "tests/test_translation_pollinations_serial.js"],
-                cwd=PROJECT_ROOT,
-            )
-        )
-        if results[-1].status == "FAIL" and args.fail_fast:
-            return results[-1].rc
-
-        note_result(
-            _run_step(
-                name="Node: pollinations smoke (mocked, no network)",
-                argv=["node", "tests/test_translation_pollinations_smoke.js"],
-                cwd=PROJECT_ROOT,
-            )
-        )
-        if results[-1].status == "FAIL" and args.fail_fast:
-            return results[-1].rc
-
-        note_result(
-            _run_step(
-                name="Node: pollinations invalid JSON smoke (mocked, no network)",
-                argv=["node", "tests/test_translation_pollinations_invalid_json_smoke.js"],
-                cwd=PROJECT_ROOT,
-            )
-        )
-        if results[-1].status == "FAIL" and args.fail_fast:
-            return results[-1].rc
-
-        note_result(
-            _run_step(
-                name="Node: gemini smoke (mocked, no network)",
-                argv=["node", "tests/test_translation_gemini_smoke.js"],
-                cwd=PROJECT_ROOT,
-            )
-        )
-        if results[-1].status == "FAIL" and args.fail_fast:
-            return results[-1].rc
+        unit_steps += [
+            ("Translation unit tests (no network keys)", [py, "tests/run_translation_tests.py"]),
+            ("Node: google-free chunking (mocked, no network)", ["node", "tests/test_translation_google_free_chunking.js"]),
+            ("Node: paid google chunking (mocked, no network)", ["node", "tests/test_translation_chunking_paid_google.js"]),
+            ("Node: LLM marker integrity (mocked, no network)", ["node", "tests/test_translation_integrity_llm_markers.js"]),
+            ("Node: anchor restore independent of order", ["node", "tests/test_anchor_restore_marker_order.js"]),
+            ("Node: selection multi-range dedupe", ["node", "tests/test_selection_multirange_dedupe.js"]),
+            ("Node: pollinations is serialized (mocked, no network)", ["node", "tests/test_translation_pollinations_serial.js"]),
+            ("Node: pollinations smoke (mocked, no network)", ["node", "tests/test_translation_pollinations_smoke.js"]),
+            ("Node: pollinations invalid JSON smoke (mocked, no network)", ["node", "tests/test_translation_pollinations_invalid_json_smoke.js"]),
+            ("Node: gemini smoke (mocked, no network)", ["node", "tests/test_translation_gemini_smoke.js"]),
+        ]
+    if unit_steps:
+        unit_results = _run_steps_parallel(steps=unit_steps, cwd=PROJECT_ROOT, jobs=args.jobs)
+        for r in unit_results:
+            note_result(r)
+        failed = next((r for r in unit_results if r.status == "FAIL"), None)
+        if failed and args.fail_fast:
+            return failed.rc
+
+    # Everything below drives a real browser, Word or the system clipboard, so it runs one step at a
+    # time. The schedule is assembled first; an argv of None records the step as skipped.
+    serial_steps: list[tuple[str, list[str] | None]] = []
 
     if not args.skip_playwright:
         pw_common: list[str] = []
@@ -229,60 +196,24 @@ def main(argv: list[str]) -> int:
         if args.debug:
             pw_common.append("--debug")
 
-        note_result(
-            _run_step(
-                name="Playwright: core copy pipeline",
-                argv=[py, "tests/test_automated.py", *pw_common],
-                cwd=PROJECT_ROOT,
-            )
-        )
-        if results[-1].status == "FAIL" and args.fail_fast:
-            return results[-1].rc
-
+        serial_steps.append(("Playwright: core copy pipeline", [py, "tests/test_automated.py", *pw_common]))
         if args.with_edge_cases:
-            note_result(
-                _run_step(
-                    name="Playwright: edge cases",
-                    argv=[py, "tests/test_edge_cases.py", *pw_common],
-                    cwd=PROJECT_ROOT,
-                )
-            )
-            if results[-1].status == "FAIL" and args.fail_fast:
-                return results[-1].rc
+            serial_steps.append(("Playwright: edge cases", [py, "tests/test_edge_cases.py", *pw_common]))
 
         if args.with_popup:
+            popup_argv: list[str] | None = [py, "tests/test_popup.py", *pw_common]
             # The MV3 test build (dist/chromium) may not include popup UI. If it's missing, skip.
             if args.browser == "chromium":
                 dist_dir = PROJECT_ROOT / "dist" / "chromium"
-                # Ensure dist exists and is fresh-ish.
+                # Ensure dist exists and matches the sources (no-op when the build stamp is current).
                 _run_step(
                     name="Build Chromium MV3 test bundle (dist/chromium)",
-                    argv=[py, "tools/build_chromium_extension.py"],
+                    argv=[py, "tools/build_chromium_extension.py", "--if-changed"],
                     cwd=PROJECT_ROOT,
                 )
                 if not _has_chromium_popup(dist_dir):
-                    note_result(StepResult(name="Playwright: popup UI", status="SKIP", rc=0))
-                else:
-                    note_result(
-                        _run_step(
-                            name="Playwright: popup UI",
-                            argv=[py, "tests/test_popup.py", *pw_common],
-                            cwd=PROJECT_ROOT,
-                        )
-                    )
-                    if results[-1].status == "FAIL" and args.fail_fast:
-                        return results[-1].rc
-                # already handled
-            else:
-                note_result(
-                    _run_step(
-                        name="Playwright: popup UI",
-                        argv=[py, "tests/test_popup.py", *pw_common],
-                        cwd=PROJECT_ROOT,
-                    )
-                )
-                if results[-1].status == "FAIL" and args.fail_fast:
-                    return results[-1].rc
+                    popup_argv = None
+            serial_steps.append(("Playwright: popup UI", popup_argv))
 
     if args.fast:
         # Skip artifact-heavy suites unless explicitly requested.
@@ -290,50 +221,45 @@ def main(argv: list[str]) -> int:
         args.skip_word = True
         args.skip_real_clipboard = True
 
+    large = ["--include-large"] if args.include_large else []
+
     if not args.skip_docx:
-        docx_args = [py, "tests/test_generate_docx_examples.py"]
-        if args.include_large:
-            docx_args.append("--include-large")
-        note_result(_run_step(name="Generate docx from examples (pure Rust tool)", argv=docx_args, cwd=PROJECT_ROOT))
-        if results[-1].status == "FAIL" and args.fail_fast:
-            return results[-1].rc
+        serial_steps.append(
+            ("Generate docx from examples (pure Rust tool)", [py, "tests/test_generate_docx_examples.py", *large])
+        )
 
     if not args.skip_word:
         # This test self-skips when Word COM is unavailable.
-        note_result(_run_step(name="Word paste verification (Windows; skips if Word not installed)", argv=[py, "tests/test_word_examples.py"], cwd=PROJECT_ROOT))
-        if results[-1].status == "FAIL" and args.fail_fast:
-            return results[-1].rc
+        serial_steps.append(
+            ("Word paste verification (Windows; skips if Word not installed)", [py, "tests/test_word_examples.py"])
+        )
 
     if not args.skip_real_clipboard:
         if not _is_windows():
-            note_result(StepResult(name="Real clipboard suites", status="SKIP", rc=0))
+            serial_steps.append(("Real clipboard suites", None))
         else:
-            note_result(_run_step(name="Real clipboard -> payloads (Windows; overwrites clipboard)", argv=[py, "tests/test_real_clipboard_payloads.py"], cwd=PROJECT_ROOT))
-            if results[-1].status == "FAIL" and args.fail_fast:
-                return results[-1].rc
-
-            clip_args = [py, "tests/test_real_clipboard_docx.py"]
-            if args.include_large:
-                clip_args.append("--include-large")
-            note_result(_run_step(name="Real clipboard -> docx (Windows; overwrites clipboard)", argv=clip_args, cwd=PROJECT_ROOT))
-            if results[-1].status == "FAIL" and args.fail_fast:
-                return results[-1].rc
-
-            note_result(_run_step(name="Real clipboard -> markdown (Windows; overwrites clipboard)", argv=[py, "tests/test_real_clipboard_markdown.py"], cwd=PROJECT_ROOT))
-            if results[-1].status == "FAIL" and args.fail_fast:
-                return results[-1].rc
+            serial_steps += [
+                ("Real clipboard -> payloads (Windows; overwrites clipboard)", [py, "tests/test_real_clipboard_payloads.py"]),
+                ("Real clipboard -> docx (Windows; overwrites clipboard)", [py, "tests/test_real_clipboard_docx.py", *large]),
+                ("Real clipboard -> markdown (Windows; overwrites clipboard)", [py, "tests/test_real_clipboard_markdown.py"]),
+            ]
 
     if not args.skip_cleanup:
-        note_result(_run_step(name="Cleanup test_results (keep most recent outputs)", argv=[py, "tools/cleanup_test_results.py"], cwd=PROJECT_ROOT))
+        serial_steps.append(("Cleanup test_results (keep most recent outputs)", [py, "tools/cleanup_test_results.py"]))
+
+    for name, step_argv in serial_steps:
+        if step_argv is None:
+            note_result(StepResult(name=name, status="SKIP", rc=0))
+            continue
+        note_result(_run_step(name=name, argv=step_argv, cwd=PROJECT_ROOT))
         if results[-1].status == "FAIL" and args.fail_fast:
             return results[-1].rc
 
-    print("\n" + "=" * 70)
-    print("SUMMARY")
-    print("=" * 70)
-    for r in results:
-        print(f"{r.status:4s}  {r.name}")
-    print("=" * 70)
+    summary = ["", "=" * 70, "SUMMARY", "=" * 70]
+    summary.extend(f"{r.status:4s}  {r.name}" for r in results)
+    summary.append("=" * 70)
+    sys.stdout.write("\n".join(summary) + "\n")
+    sys.stdout.flush()
 
     return 0 if first_fail_rc is None else (first_fail_rc or 1)
 
@@ -11,11 +11,8 @@ Usage:
     python tests/test_auto_reload.py [--headless] [--debug]
 """
 
-import asyncio
 import argparse
 import json
-import re
-import sys
 from pathlib import Path
 from playwright.async_api import async_playwright, BrowserContext, Page, TimeoutError as PlaywrightTimeout
 from typing import Dict, Optional, Tuple
@@ -26,15 +23,154 @@ EXTENSION_PATH = PROJECT_ROOT / "extension"
 EXAMPLES_DIR = PROJECT_ROOT / "examples"
 MANIFEST_PATH = EXTENSION_PATH / "manifest.json"
 
+# First UUID anywhere in the page markup; the scan runs in-page so only the match crosses
+# the wire instead of the whole serialized about:debugging DOM.
+_JS_FIRST_UUID = r"""
+() => {
+    const m = document.documentElement.outerHTML.match(/[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}/);
+    return m ? m[0] : null;
+}
+"""
+
+# Any of the content-script markers.
+_JS_EXTENSION_MARKERS = """
+() => document.documentElement?.dataset?.copyOfficeFormatExtensionLoaded === 'true'
+    || typeof window.__copyOfficeFormatExtension !== 'undefined'
+    || (typeof browser !== 'undefined' && typeof browser.runtime !== 'undefined')
+"""
+
+_JS_ADDON_ID = "() => document.querySelector('[data-addon-id]')?.getAttribute('data-addon-id') || null"
+
+# Tag the "Load Temporary Add-on..." button in one scan (text, l10n id or aria label) so it
+# can be clicked with a single locator; truthy once found, so it doubles as a wait predicate.
+_JS_TAG_LOAD_BUTTON = r"""
+() => {
+    // Text matches only in English; the l10n id (about-debugging-tmp-extension-install-button)
+    // matches in every locale.
+    const re = /load temporary|temporary[- ]add-?on|tmp-extension-install/i;
+    for (const b of document.querySelectorAll('button')) {
+        const hay = [b.textContent, b.dataset.l10nId, b.getAttribute('aria-label')].join(' ');
+        if (re.test(hay)) {
+            b.setAttribute('data-cof-load-button', '');
+            return true;
+        }
+    }
+    return false;
+}
+"""
+
+
+# One in-page copy cycle: select the first text node with a formula, trigger the copy,
+# wait for the content script's done/error diagnostics, then read the clipboard.
+_JS_COPY_CYCLE = r"""
+async ({ timeoutMs, types }) => {
+    const result = { selected: false, done: false };
+    // Error strings are capped too, so the returned object stays a few hundred bytes.
+    const clip = (s) => String(s ?? '').slice(0, 300);
+
+    const walker = document.createTreeWalker(document.body, NodeFilter.SHOW_TEXT, null, false);
+    let node;
+    while (node = walker.nextNode()) {
+        if (node.textContent.includes('$') || node.textContent.includes('\(')) {
+            const range = document.createRange();
+            range.selectNodeContents(node.parentElement || node);
+            const sel = window.getSelection();
+            sel.removeAllRanges();
+            sel.addRange(range);
+            result.selected = true;
+            break;
+        }
+    }
+    if (!result.selected) return result;
+
+    // Clear the previous copy's diagnostics so the wait below sees only this one.
+    const root = document.documentElement;
+    const ds = root.dataset;
+    delete ds.copyOfficeFormatLastStage;
+    delete ds.copyOfficeFormatLastCopyError;
+    const finished = () => ds.copyOfficeFormatLastStage === 'done' || !!ds.copyOfficeFormatLastCopyError;
+
+    try {
+        if (typeof browser === 'undefined' || !browser.runtime) {
+            result.triggerError = 'browser.runtime not available';
+            return result;
+        }
+        await browser.runtime.sendMessage({type: 'COPY_OFFICE_FORMAT'});
+    } catch (e) {
+        result.triggerError = clip(e.message);
+        return result;
+    }
+
+    if (!finished()) {
+        // Timer is cleared once the copy finishes, so it doesn't outlive the wait.
+        await new Promise((resolve) => {
+            const observer = new MutationObserver(() => {
+                if (finished()) {
+                    clearTimeout(timer);
+                    observer.disconnect();
+                    resolve();
+                }
+            });
+            observer.observe(root, { attributes: true });
+            const timer = setTimeout(() => {
+                observer.disconnect();
+                resolve();
+            }, timeoutMs);
+        });
+    }
+    result.done = finished();
+    result.copyError = clip(ds.copyOfficeFormatLastCopyError);
+    if (result.copyError) return result;
+
+    // Only materialize the requested formats, and scan them here: just flags, lengths and a
+    // short preview cross back to Python instead of the (possibly multi-MB) HTML.
+    try {
+        const clipboardItems = await navigator.clipboard.read();
+        // Fetch every requested blob concurrently; later items win, as with the sequential loop.
+        const entries = await Promise.all(clipboardItems.flatMap((item) =>
+            item.types
+                .filter((t) => types.includes(t))
+                .map(async (t) => [t, await (await item.getType(t)).text()])
+        ));
+        const blobs = Object.fromEntries(entries);
+        const html = blobs['text/html'] ?? '';
+        const text = blobs['text/plain'] ?? null;
+        // OMML means the formulas were converted; the other scans only matter without it.
+        // ('m:oMath' also matches 'm:oMathPara'.)
+        const omml = html.includes('m:oMath')
+            || html.includes('xmlns:m="http://schemas.openxmlformats.org/officeDocument/2006/math"');
+        result.html = {
+            len: html.length,
+            preview: html.slice(0, 100),
+            omml,
+            cfHtml: !omml && (html.startsWith('Version:') || html.includes('StartHTML:') || html.includes('EndHTML:')),
+            rawLatex: !omml && /\$[^$]+\$|\\\[[\s\S]*?\\\]/.test(html),
+        };
+        result.textLen = text === null ? null : text.length;
+        result.success = true;
+    } catch (e) {
+        result.success = false;
+        result.error = clip(e.message);
+    }
+    return result;
+}
+"""
+
 
 class AutoReloadTester:
     def __init__(self, extension_path: Path, headless: bool = False, debug: bool = False):
         self.extension_path = extension_path
+        # Resolved once: a cwd change mid-run can't shift these, and per-test calls just look them up.
+        self._manifest_path_str = str((extension_path / "manifest.json").absolute())
+        self._file_urls: Dict[Path, str] = {}
         self.headless = headless
         self.debug = debug
+        self._playwright = None
         self.context: BrowserContext = None
         self.page: Page = None
         self.extension_id: Optional[str] = None
+        # Digest of the extension sources as last (re)loaded; None until the first load.
+        self._loaded_digest: Optional[str] = None
         self.passed = 0
         self.failed = 0
     
@@ -53,13 +189,27 @@ class AutoReloadTester:
         
         print(f"{prefix} {message}")
     
+    def _file_url(self, path: Path) -> str:
+        url = self._file_urls.get(path)
+        if url is None:
+            url = self._file_urls[path] = path.absolute().as_uri()
+        return url
+    
+    def _sources_digest(self) -> str:
+        from tools.build_chromium_extension import hash_sources  # type: ignore
+        return hash_sources(self.extension_path)
+    
+    def _sources_changed(self) -> bool:
+        """True if the extension sources differ from what is currently loaded."""
+        return self._sources_digest() != self._loaded_digest
+    
     async def setup(self):
         """Set up Playwright with Firefox."""
         self.log("Setting up Firefox...", "info")
-        playwright = await async_playwright().start()
+        self._playwright = await async_playwright().start()
         
         # Launch Firefox persistent context (allows extension management)
-        self.context = await playwright.firefox.launch_persistent_context(
+        self.context = await self._playwright.firefox.launch_persistent_context(
             user_data_dir=Path.home() / ".playwright-firefox-test-reload",
             headless=self.headless,
             args=[]  # No extension loaded initially
@@ -80,61 +230,45 @@ class AutoReloadTester:
         
         try:
             # Navigate to about:debugging
+            # The button wait below covers the app rendering after domcontentloaded.
             await self.page.goto("about:debugging#/runtime/this-firefox", wait_until="domcontentloaded", timeout=10000)
-            await asyncio.sleep(1)  # Wait for page to load
             
             # Click "Load Temporary Add-on..." button
             self.log("Clicking 'Load Temporary Add-on...' button...", "debug")
-            
-            # Try to find and click the button
             try:
-                # Look for button with text containing "Load" or "Temporary"
-                load_button = await self.page.wait_for_selector(
-                    'button:has-text("Load Temporary Add-on"), button:has-text("Load"), button[data-l10n-id="addons-debugging-load-temporary-addon"]',
-                    timeout=5000
-                )
-                await load_button.click()
-                await asyncio.sleep(0.5)
+                await self.page.wait_for_function(_JS_TAG_LOAD_BUTTON, timeout=5000)
             except PlaywrightTimeout:
-                # Try alternative selectors
-                try:
-                    load_button = await self.page.query_selector('button')
-                    if load_button:
-                        await load_button.click()
-                        await asyncio.sleep(0.5)
-                except Exception as e:
-                    self.log(f"Could not find load button: {e}", "error")
-                    return False
+                self.log("Could not find load button", "error")
+                return False
             
-            # Handle file picker - select manifest.json
+            # Handle file picker - select manifest.json (the click must happen inside the wait)
             self.log("Selecting manifest.json file...", "debug")
             async with self.page.expect_file_chooser() as fc_info:
-                # The file chooser should appear after clicking the button
-                pass
+                await self.page.locator("[data-cof-load-button]").click()
             
             file_chooser = await fc_info.value
-            manifest_path_str = str(MANIFEST_PATH.absolute())
-            await file_chooser.set_files(manifest_path_str)
-            await asyncio.sleep(2)  # Wait for extension to load
+            await file_chooser.set_files(self._manifest_path_str)
+            self._loaded_digest = self._sources_digest()
+            # Wait for the add-on to show up in the list rather than a fixed sleep.
+            try:
+                await self.page.wait_for_selector("[data-addon-id]", timeout=10000)
+            except PlaywrightTimeout:
+                self.log("Add-on entry did not appear in about:debugging", "warning")
             
             # Get extension ID from the page
             self.log("Extracting extension ID...", "debug")
             try:
-                # Look for extension ID in the page
-                extension_elements = await self.page.query_selector_all('[data-addon-id]')
-                if extension_elements:
-                    extension_id_attr = await extension_elements[0].get_attribute('data-addon-id')
-                    if extension_id_attr:
-                        self.extension_id = extension_id_attr
-                        self.log(f"Extension ID: {self.extension_id}", "success")
-                        return True
+                # Look for extension ID in the page (element lookup and attribute read in one call)
+                extension_id_attr = await self.page.evaluate(_JS_ADDON_ID)
+                if extension_id_attr:
+                    self.extension_id = extension_id_attr
+                    self.log(f"Extension ID: {self.extension_id}", "success")
+                    return True
                 
                 # Alternative: look for UUID pattern in page content
-                page_content = await self.page.content()
-                uuid_pattern = r'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}'
-                matches = re.findall(uuid_pattern, page_content)
-                if matches:
-                    self.extension_id = matches[0]
+                uuid = await self.page.evaluate(_JS_FIRST_UUID)
+                if uuid:
+                    self.extension_id = uuid
                     self.log(f"Extension ID (from page): {self.extension_id}", "success")
                     return True
                 
@@ -156,24 +290,27 @@ class AutoReloadTester:
         try:
             # Navigate to about:debugging
             await self.page.goto("about:debugging#/runtime/this-firefox", wait_until="domcontentloaded", timeout=10000)
-            await asyncio.sleep(1)
             
-            # Find reload button for our extension
+            # Find reload button for our extension (waits for the add-on list to render)
             if self.extension_id:
-                reload_button = await self.page.query_selector(f'[data-addon-id="{self.extension_id}"] button[title*="Reload"], [data-addon-id="{self.extension_id}"] button:has-text("Reload")')
+                reload_selector = f'[data-addon-id="{self.extension_id}"] button[title*="Reload"], [data-addon-id="{self.extension_id}"] button:has-text("Reload")'
             else:
                 # Try to find any reload button
-                reload_button = await self.page.query_selector('button:has-text("Reload"), button[title*="Reload"]')
+                reload_selector = 'button:has-text("Reload"), button[title*="Reload"]'
+            try:
+                reload_button = await self.page.wait_for_selector(reload_selector, timeout=5000)
+            except PlaywrightTimeout:
+                reload_button = None
             
             if reload_button:
                 await reload_button.click()
-                await asyncio.sleep(2)  # Wait for reload
+                self._loaded_digest = self._sources_digest()
+                # Content scripts inject on the next navigation; the test's marker wait covers it.
                 self.log("Extension reloaded", "success")
                 return True
             else:
                 self.log("Reload button not found, trying to reload via page refresh", "warning")
-                await self.page.reload()
-                await asyncio.sleep(2)
+                await self.page.reload(wait_until="domcontentloaded")
                 return True
                 
         except Exception as e:
@@ -185,151 +322,72 @@ class AutoReloadTester:
         self.log("Verifying extension is loaded...", "debug")
         
         try:
-            # Check for extension marker
-            result = await self.page.evaluate("""
-                () => {
-                    return typeof window.__copyOfficeFormatExtension !== 'undefined';
-                }
-            """)
-            
-            if result:
-                self.log("Extension marker found", "success")
-                return True
-            
-            # Check for browser.runtime
-            result = await self.page.evaluate("""
-                () => {
-                    return typeof browser !== 'undefined' && typeof browser.runtime !== 'undefined';
-                }
-            """)
-            
-            if result:
-                self.log("Extension runtime found", "success")
-                return True
-            
+            # Polled in-page and resolved as soon as one marker appears.
+            await self.page.wait_for_function(
+                _JS_EXTENSION_MARKERS,
+                polling=20,
+                timeout=1000,
+            )
+            self.log("Extension marker found", "success")
+            return True
+        except PlaywrightTimeout:
             self.log("Extension not detected", "error")
             return False
-            
         except Exception as e:
             self.log(f"Error checking extension: {e}", "error")
             return False
     
-    async def test_copy_with_formula(self, test_html: Path) -> Tuple[bool, str]:
+    async def test_copy_with_formula(self, test_html: Path, clipboard_types: Tuple[str, ...] = ("text/html",)) -> Tuple[bool, str]:
         """Test copy functionality with LaTeX formula."""
         self.log(f"Testing copy with formula from {test_html.name}...", "info")
         
         try:
             # Load test page
-            file_url = f"file://{test_html.absolute()}"
+            file_url = self._file_url(test_html)
+            # domcontentloaded is enough for a local file; the marker wait below covers injection.
             await self.page.goto(file_url, wait_until="domcontentloaded", timeout=10000)
-            await asyncio.sleep(1)
             
             # Verify extension is loaded
             if not await self.verify_extension_loaded():
                 return False, "Extension not loaded"
             
-            # Select text with formula
-            self.log("Selecting text with formula...", "debug")
-            await self.page.evaluate("""
-                () => {
-                    const walker = document.createTreeWalker(
-                        document.body,
-                        NodeFilter.SHOW_TEXT,
-                        null,
-                        false
-                    );
-                    
-                    let node;
-                    while (node = walker.nextNode()) {
-                        if (node.textContent.includes('$') || node.textContent.includes('\\(')) {
-                            const range = document.createRange();
-                            range.selectNodeContents(node.parentElement || node);
-                            const sel = window.getSelection();
-                            sel.removeAllRanges();
-                            sel.addRange(range);
-                            return true;
-                        }
-                    }
-                    return false;
-                }
-            """)
-            
-            await asyncio.sleep(0.5)
-            
-            # Trigger copy via context menu message
-            self.log("Triggering copy...", "debug")
-            copy_result = await self.page.evaluate("""
-                async () => {
-                    try {
-                        if (typeof browser !== 'undefined' && browser.runtime) {
-                            await browser.runtime.sendMessage({type: 'COPY_OFFICE_FORMAT'});
-                            return {success: true};
-                        }
-                        return {success: false, error: 'browser.runtime not available'};
-                    } catch (e) {
-                        return {success: false, error: e.message};
-                    }
-                }
-            """)
-            
-            if not copy_result.get('success'):
-                return False, f"Copy trigger failed: {copy_result.get('error')}"
-            
-            # Wait for copy to complete
-            await asyncio.sleep(2)
-            
-            # Verify clipboard content
-            self.log("Verifying clipboard content...", "debug")
-            clipboard_result = await self.page.evaluate("""
-                async () => {
-                    try {
-                        const clipboardText = await navigator.clipboard.readText();
-                        const clipboardItems = await navigator.clipboard.read();
-                        
-                        let htmlContent = null;
-                        for (const item of clipboardItems) {
-                            if (item.types.includes('text/html')) {
-                                htmlContent = await item.getType('text/html').then(blob => blob.text());
-                            }
-                        }
-                        
-                        return {
-                            success: true,
-                            text: clipboardText,
-                            html: htmlContent
-                        };
-                    } catch (e) {
-                        return {success: false, error: e.message};
-                    }
-                }
-            """)
-            
+            # Select, copy, wait for completion and read the clipboard in one round trip.
+            self.log("Selecting text with formula and copying...", "debug")
+            clipboard_result = await self.page.evaluate(
+                _JS_COPY_CYCLE, {"timeoutMs": 10000, "types": list(clipboard_types)}
+            )
+            
+            if not clipboard_result.get('selected'):
+                return False, "No text with a formula found to select"
+            if clipboard_result.get('triggerError'):
+                return False, f"Copy trigger failed: {clipboard_result.get('triggerError')}"
+            if clipboard_result.get('copyError'):
+                return False, f"Copy failed: {clipboard_result.get('copyError')}"
+            if not clipboard_result.get('done'):
+                self.log("Copy did not report completion; checking clipboard anyway", "warning")
             if not clipboard_result.get('success'):
                 return False, f"Clipboard read failed: {clipboard_result.get('error')}"
             
-            html_content = clipboard_result.get('html', '')
-            text_content = clipboard_result.get('text', '')
-            
-            # Check for OMML namespace (Office Math)
-            has_omml = 'm:oMath' in html_content or 'm:oMathPara' in html_content or 'xmlns:m="http://schemas.openxmlformats.org/officeDocument/2006/math"' in html_content
+            html = clipboard_result.get('html') or {}
+            if not html.get('len'):
+                return False, "Clipboard has no HTML content"
+            self.log(f"HTML preview: {html.get('preview', '')!r}", "debug")
             
-            # Check for CF_HTML format
-            has_cf_html = html_content.startswith('Version:') or 'StartHTML:' in html_content or 'EndHTML:' in html_content
-            
-            # Check that LaTeX is converted (no raw $ signs in HTML)
-            has_raw_latex = '$' in html_content and not has_omml
-            
-            if has_omml:
+            if html.get('omml'):
                 self.log("✅ OMML found in clipboard (formulas converted)", "success")
-            elif has_cf_html:
-                self.log("✅ CF_HTML format found", "success")
             else:
-                self.log("⚠️ Standard HTML format", "warning")
-            
-            if has_raw_latex:
-                return False, "Raw LaTeX found in clipboard (formulas not converted)"
+                if html.get('cfHtml'):
+                    self.log("✅ CF_HTML format found", "success")
+                else:
+                    self.log("⚠️ Standard HTML format", "warning")
+                
+                # Check that LaTeX is converted (no raw $...$ / \[...\] spans in HTML)
+                if html.get('rawLatex'):
+                    return False, "Raw LaTeX found in clipboard (formulas not converted)"
             
-            return True, f"Clipboard verified: HTML length={len(html_content)}, Text length={len(text_content)}"
+            text_len = clipboard_result.get('textLen')
+            text_note = f", Text length={text_len}" if text_len is not None else ""
+            return True, f"Clipboard verified: HTML length={html['len']}{text_note}"
             
         except Exception as e:
             return False, f"Test failed: {str(e)}"
@@ -362,9 +420,9 @@ class AutoReloadTester:
         for test_file in test_files[:3]:  # Test first 3 files
             self.log(f"\n--- Testing {test_file.name} ---", "info")
             
-            # Reload extension before each test
-            await self.reload_extension()
-            await asyncio.sleep(1)
+            # Reload only when the extension sources changed since they were last loaded
+            if self._sources_changed():
+                await self.reload_extension()
             
             # Run test
             success, message = await self.test_copy_with_formula(test_file)
@@ -388,6 +446,12 @@ class AutoReloadTester:
         """Clean up resources."""
         if self.context:
             await self.context.close()
+            self.context = None
+        
+        # Stop the driver explicitly (after the context: stop() tears down the connection close() uses).
+        if self._playwright:
+            await self._playwright.stop()
+            self._playwright = None
 
 
 async def main():
@@ -406,5 +470,7 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    from tools.async_run import run  # type: ignore
+
+    run(main())
 
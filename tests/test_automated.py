@@ -5,44 +5,414 @@ This test runs 100% automatically - no manual steps required.
 
 Usage:
     python test_automated.py [--browser chromium|firefox] [--headless] [--debug]
+
+Warm start (chromium): keep one browser alive and attach repeated runs to it:
+    python test_automated.py --serve 9333
+    python test_automated.py --connect http://127.0.0.1:9333
 """
 
 import asyncio
 import argparse
+import hashlib
 import json
+import logging
 import os
+import re
 import sys
 import threading
 import tempfile
 import shutil
+from dataclasses import dataclass
 from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
 from pathlib import Path
-from playwright.async_api import async_playwright, BrowserContext, Page
+from playwright.async_api import async_playwright, BrowserContext, Page, TimeoutError as PlaywrightTimeoutError
 
 
 PROJECT_ROOT = Path(__file__).parent.parent
 EXTENSION_PATH = PROJECT_ROOT / "extension"
-TEST_HTML = PROJECT_ROOT / "examples" / "gemini-conversation-test.html"
+EXAMPLES_DIR = PROJECT_ROOT / "examples"
+TEST_HTML = EXAMPLES_DIR / "gemini-conversation-test.html"
+
+logger = logging.getLogger("auto-ext-test")
 
 CHROMIUM_EXTENSION_PATH = PROJECT_ROOT / "dist" / "chromium"
+# Post-first-launch Chromium profile (extension installed, SW registered); tied to the build stamp.
+CHROMIUM_PROFILE_SEED = PROJECT_ROOT / ".cache" / "chromium-profile-seed"
+PROFILE_SEED_STAMP_NAME = ".cof_seed_stamp"
+# Volatile bits not worth seeding (locks of the dead process, disk caches).
+_PROFILE_SEED_IGNORE = shutil.ignore_patterns("Singleton*", "Cache", "Code Cache", "GPUCache", "Crashpad")
+
+
+@dataclass(frozen=True)
+class CopyCase:
+    name: str
+    selector: str
+    html: Path | None = None  # None: the tester's default test_html
+    expect_formulas: bool = False
+    copy_mode: str = "html"
+    expect_markdown: bool = False
+    measure_performance: bool = False
+    optional: bool = False  # skip (with a note) when the example file is missing
+
+    @property
+    def slug(self) -> str:
+        """Directory name for this case's saved clipboard artifacts (see --offline)."""
+        return re.sub(r"[^a-z0-9]+", "-", self.name.lower()).strip("-")
+
+
+COPY_CASES = [
+    CopyCase("Basic Text Selection", "user-query-content:first-of-type"),
+    CopyCase("Text with LaTeX Formulas", "message-content:first-of-type", expect_formulas=True),
+    CopyCase(
+        "Multiple Messages with Formulas",
+        "message-content:first-of-type, message-content:nth-of-type(2)",
+        expect_formulas=True,
+    ),
+    # Forced Rust WASM conversion (no external renderer fallback)
+    CopyCase(
+        "Forced Rust WASM LaTeX Conversion",
+        "#content",
+        html=EXAMPLES_DIR / "force-wasm-latex-test.html",
+        expect_formulas=True,
+    ),
+    CopyCase(
+        "Forced Rust WASM Unicode Normalization",
+        "#content",
+        html=EXAMPLES_DIR / "force-wasm-unicode-math-test.html",
+        expect_formulas=True,
+    ),
+    CopyCase(
+        "Copy as Markdown",
+        "#extended-response-markdown-content",
+        html=EXAMPLES_DIR / "selection_example_static.html",
+        copy_mode="markdown-export",
+        expect_markdown=True,
+    ),
+    # This selection may not always have formulas, so we don't require them.
+    CopyCase(
+        "Copy Office Format from Markdown Selection",
+        "#extended-response-markdown-content",
+        html=EXAMPLES_DIR / "selection_example_static.html",
+        copy_mode="markdown",
+    ),
+    CopyCase(
+        "Extract Selected HTML",
+        "message-content:first-of-type",
+        html=EXAMPLES_DIR / "gemini-conversation-test.html",
+        copy_mode="extract",
+    ),
+    CopyCase(
+        "Performance: Large Selection",
+        "body",
+        html=EXAMPLES_DIR / "test_large_selection.html",
+        measure_performance=True,
+        optional=True,
+    ),
+]
+
+
+# Clipboard HTML markers, matched case-insensitively in place (no lowercased copy of large fragments).
+_OMML_RE = re.compile(r"mso-element:omath|<m:omath", re.IGNORECASE)
+_MATHML_RE = re.compile(r"http://www\.w3\.org/1998/Math/MathML", re.IGNORECASE)
+_PARSE_ERROR_RE = re.compile(r"\[PARSE ERROR:", re.IGNORECASE)
+_WORD_WRAPPED_RE = re.compile(r"\A\s*<!doctype html|urn:schemas-microsoft-com:office:office", re.IGNORECASE)
+
+# Headings, list bullets or code spans/fences in copied plain text.
+_MARKDOWN_MARKER_RE = re.compile(r"# |\* |- |`")
+
+# Static page/service-worker scripts; inputs are passed as evaluate() args, never formatted in.
+_JS_DOM_PROBE = """
+async () => {
+    if (document.readyState === "loading") {
+        await new Promise((resolve) =>
+            document.addEventListener("DOMContentLoaded", resolve, { once: true })
+        );
+    }
+    const value = String(window.__pwDomProbeSeq = (window.__pwDomProbeSeq || 0) + 1);
+    let el = document.getElementById("__pw_dom_probe");
+    if (!el) {
+        el = document.createElement("div");
+        el.id = "__pw_dom_probe";
+        el.style.display = "none";
+        document.documentElement.appendChild(el);
+    }
+    el.textContent = value;
+    return { written: value, read: document.getElementById("__pw_dom_probe")?.textContent || "" };
+}
+"""
+
+_JS_RESET_PAGE_STATE = """
+() => {
+    window.getSelection()?.removeAllRanges();
+    const ds = document.documentElement?.dataset;
+    if (ds) {
+        delete ds.copyOfficeFormatLastStage;
+        delete ds.copyOfficeFormatLastCopyError;
+        delete ds.extractSelectedHtmlLastStage;
+        delete ds.extractSelectedHtmlLastError;
+        delete ds.clipboardLastWrite;
+    }
+    return document.readyState !== "loading";
+}
+"""
+
+_JS_EXTENSION_LOADED = "() => document.documentElement?.dataset?.copyOfficeFormatExtensionLoaded === 'true'"
+
+# The content script records clipboardLastWrite only with debug logs on. Storage drives the flag
+# for copies that read the config; the page flag covers modes that never do.
+_JS_ENABLE_DEBUG_LOGS = """
+async () => {
+    const key = "gptLatexCtrlCVConfig";
+    const cfg = (await chrome.storage.local.get(key))[key] || {};
+    cfg.debug = { ...(cfg.debug || {}), logsEnabled: true };
+    await chrome.storage.local.set({ [key]: cfg });
+}
+"""
+
+_JS_ENABLE_PAGE_DEBUG_LOGS = "() => { document.documentElement.dataset.copyOfficeFormatDebugLogs = 'true'; }"
+
+_JS_SELECT = """
+async ({ selector, timeoutMs }) => {
+    let element = document.querySelector(selector);
+    if (!element) {
+        // Bounded by a timer that is cleared as soon as the element shows up, so
+        // neither the observer nor the timeout outlives the wait.
+        element = await new Promise((resolve) => {
+            const observer = new MutationObserver(() => {
+                const found = document.querySelector(selector);
+                if (!found) return;
+                clearTimeout(timer);
+                observer.disconnect();
+                resolve(found);
+            });
+            observer.observe(document, { childList: true, subtree: true });
+            const timer = setTimeout(() => {
+                observer.disconnect();
+                resolve(null);
+            }, timeoutMs);
+        });
+    }
+    if (!element) return { found: false, text: '' };
+
+    const range = document.createRange();
+    range.selectNodeContents(element);
+    const selection = window.getSelection();
+    selection.removeAllRanges();
+    selection.addRange(range);
+
+    return { found: true, text: selection.toString() };
+}
+"""
+
+# Runs in the Chromium service worker (chrome.*) or a Firefox extension page (browser.*).
+_JS_SEND_TO_ACTIVE_TAB = """
+async ({ message }) => {
+    const api = globalThis.browser || globalThis.chrome;
+    if (!api?.tabs) throw new Error("tabs API unavailable");
+    function call(fn, ...args) {
+        return new Promise((resolve, reject) => {
+            fn(...args, (result) => {
+                const err = api.runtime?.lastError;
+                if (err) reject(new Error(err.message || String(err)));
+                else resolve(result);
+            });
+        });
+    }
+    const tabs = await call(api.tabs.query, { active: true, currentWindow: true });
+    const tabId = tabs && tabs[0] ? tabs[0].id : null;
+    if (!tabId) throw new Error("no active tab");
+    const resp = await call(api.tabs.sendMessage, tabId, message);
+    return resp || null;
+}
+"""
+
+# Extract mode records its own stage/error keys; clipboardLastWrite summarizes the written payload.
+_JS_COPY_DIAG = """
+({ mode }) => {
+    const ds = document.documentElement?.dataset || {};
+    const extract = mode === 'extract';
+    const stage = extract ? ds.extractSelectedHtmlLastStage : ds.copyOfficeFormatLastStage;
+    const error = extract ? ds.extractSelectedHtmlLastError : ds.copyOfficeFormatLastCopyError;
+    let write = null;
+    try {
+        write = JSON.parse(ds.clipboardLastWrite || 'null');
+    } catch (e) {
+        write = null;
+    }
+    return { stage: stage || '', error: (error || '').slice(0, 300), write };
+}
+"""
+
+_JS_LAST_COPY_ERROR = "() => document.documentElement?.dataset?.copyOfficeFormatLastCopyError || ''"
+
+_JS_WASM_LOAD = """
+async () => {
+    if (!window.__cof?.wasm) return false;
+    try {
+        await window.__cof.wasm.load();
+        return true;
+    } catch (e) {
+        return false;
+    }
+}
+"""
+
+def _empty_verification() -> dict:
+    return {
+        "has_content": False,
+        "has_html": False,
+        "has_plain_text": False,
+        "contains_omml": False,
+        "contains_mathml": False,
+        "no_parse_error_markers": True,
+        "is_markdown": False,
+        "error": None,
+    }
+
+
+def check_clipboard_dump(
+    dump: dict,
+    expected_token: str,
+    expect_formulas: bool,
+    expect_markdown: bool = False,
+    copy_mode: str = "html",
+) -> dict:
+    """Check a `dump_clipboard()` result (live or a saved dump.json); no browser or OS access."""
+    verification = _empty_verification()
+    verification["has_content"] = True
+    plain_text = str(dump.get("plain_text", ""))
+    if plain_text:
+        verification["has_plain_text"] = True
+
+    fragment = str(dump.get("fragment", ""))
+    if fragment:
+        verification["has_html"] = True
+        if _OMML_RE.search(fragment):
+            verification["contains_omml"] = True
+        if _MATHML_RE.search(fragment):
+            verification["contains_mathml"] = True
+        if _PARSE_ERROR_RE.search(fragment):
+            verification["no_parse_error_markers"] = False
+    
+    # Extract mode now copies the selection HTML exactly; require HTML to be present.
+    if copy_mode == "extract":
+        if not fragment:
+            verification["error"] = "clipboard missing HTML fragment (extract mode)"
+            return verification
+        # Ensure we didn't accidentally emit Word-wrapped Office HTML.
+        if _WORD_WRAPPED_RE.search(fragment):
+            verification["error"] = "extract mode should copy exact HTML fragment (not Word-wrapped HTML)"
+            return verification
+    
+    # Check if markdown (plain text with markdown syntax).
+    if expect_markdown:
+        if plain_text:
+            if _MARKDOWN_MARKER_RE.search(plain_text) or ("\n" in plain_text and len(plain_text) > 50):
+                verification["is_markdown"] = True
+
+    # For markdown export and extract, we expect plain text, not HTML
+    # So we should check plain text for the token, not require HTML
+    if expected_token:
+        if expect_markdown:
+            # For markdown/extract, check plain text only
+            # Be lenient - check if any part of the token appears, or if clipboard has content
+            if plain_text and (expected_token.lower() in plain_text.lower() or len(plain_text) > 50):
+                # Token found or substantial content present - consider it successful
+                pass
+            else:
+                verification["error"] = "clipboard did not update with expected token"
+                return verification
+        else:
+            # For HTML modes, check both plain text and HTML fragment
+            if expected_token not in plain_text and expected_token not in fragment:
+                verification["error"] = "clipboard did not update with expected token"
+                return verification
+
+    # For markdown selection mode, formulas might not always be present in the selection
+    # Only check for formulas if we're in HTML mode (not markdown selection) and expect_formulas is True
+    # Markdown selection mode converts markdown to HTML, so formulas should be present
+    if expect_formulas and copy_mode == "markdown":
+        # Markdown selection should convert markdown to Office HTML with formulas
+        # So we should still check for formulas
+        if not (verification["contains_omml"] or verification["contains_mathml"]):
+            # This might be OK if the selection doesn't contain formulas
+            # Don't fail, just log a warning
+            pass
+    elif expect_formulas and copy_mode != "extract" and not (verification["contains_omml"] or verification["contains_mathml"]):
+        verification["error"] = "clipboard missing OMML/MathML"
+        return verification
+
+    if not verification["no_parse_error_markers"]:
+        verification["error"] = "clipboard contains PARSE ERROR markers"
+        return verification
+
+    return verification
 
 
 class _QuietHandler(SimpleHTTPRequestHandler):
+    # URL path -> body for examples/*.html; the same few pages are requested by every test.
+    _cache: dict[str, bytes] = {}
+
     def log_message(self, fmt, *args):
         return
 
+    def do_GET(self):
+        path = self.path.split("?", 1)[0].split("#", 1)[0]
+        body = self._cache.get(path)
+        if body is None and path.startswith("/examples/") and path.endswith(".html"):
+            try:
+                body = Path(self.translate_path(path)).read_bytes()
+            except OSError:
+                body = None
+            else:
+                self._cache[path] = body
+        if body is None:
+            return super().do_GET()
+        self.send_response(200)
+        self.send_header("Content-Type", self.guess_type(path))
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class _TestHTTPServer(ThreadingHTTPServer):
+    # Rebind over TIME_WAIT; on Windows SO_REUSEADDR would let two servers share a port.
+    allow_reuse_address = os.name != "nt"
+    daemon_threads = True
+
+
+# Deterministic per-process base port so sharded CI processes don't share ephemeral ports.
+HTTP_PORT_BASE = 40000 + os.getpid() % 1000
+HTTP_PORT_ATTEMPTS = 20
+
 
 class AutomatedExtensionTester:
-    def __init__(self, extension_path: Path, test_html: Path, browser_name: str = "chromium", headless: bool = False, debug: bool = False):
+    # Content-script marker wait. Poll on an interval: rAF polling stalls in the minimized window.
+    _EXT_MARKER_TIMEOUT_MS = 500
+    _EXT_MARKER_POLL_MS = 20
+
+    def __init__(self, extension_path: Path, test_html: Path, browser_name: str = "chromium", headless: bool = False, debug: bool = False, parallel: int = 1, shards: int = 1, shard_id: int = 0, connect_url: str | None = None, force_reload: bool = False):
         self.extension_path = extension_path
         self.test_html = test_html
         self.browser_name = browser_name
         self.headless = headless
         self.debug = debug
+        self.parallel = parallel
+        self.shards = shards
+        self.shard_id = shard_id
+        # CDP endpoint of a `--serve` daemon; when set, setup() attaches instead of launching.
+        self.connect_url = connect_url
+        # Consecutive cases on the same page reuse the loaded document unless this is set.
+        self.force_reload = force_reload
+        # Parallel lanes share one OS clipboard; they verify via the content script's diagnostics.
+        self.verify_in_page = False
+        self._serve_port: int | None = None
+        self._browser = None
         self._playwright = None
         self.context: BrowserContext = None
         self.page: Page = None
         self.service_worker = None
+        self._default_test_html = test_html
         self.results = {
             "tests_run": 0,
             "tests_passed": 0,
@@ -52,6 +422,10 @@ class AutomatedExtensionTester:
         self._httpd = None
         self._http_thread = None
         self._user_data_dir: Path | None = None
+        self._profile_seeded = False
+        # URL whose content-script marker was last seen; cleared by every real navigation, so only
+        # a reused (same-document) page skips the marker wait.
+        self._verified_url: str | None = None
     
     def log(self, message: str, level: str = "info"):
         """Log message with optional debug output."""
@@ -69,12 +443,53 @@ class AutomatedExtensionTester:
         print(f"{prefix} {message}")
 
     def _ensure_chromium_extension(self) -> Path:
-        """Build the Chromium MV3 extension dir (deterministic; ensures latest sources are copied)."""
-        from tools.build_chromium_extension import build  # type: ignore
+        """Build the Chromium MV3 extension dir (skipped when the build stamp is newer than the sources)."""
+        from tools.build_chromium_extension import ensure_built  # type: ignore
 
-        built = build(CHROMIUM_EXTENSION_PATH)
+        built = ensure_built(CHROMIUM_EXTENSION_PATH)
         return built
 
+    @staticmethod
+    def _build_stamp() -> str:
+        from tools.build_chromium_extension import BUILD_STAMP_NAME  # type: ignore
+
+        try:
+            return (CHROMIUM_EXTENSION_PATH / BUILD_STAMP_NAME).read_text(encoding="utf-8").strip()
+        except OSError:
+            return ""
+
+    def _seed_profile(self, user_data_dir: Path) -> bool:
+        """Copy the cached profile seed into `user_data_dir` if it matches the current build."""
+        stamp = self._build_stamp()
+        try:
+            seed_stamp = (CHROMIUM_PROFILE_SEED / PROFILE_SEED_STAMP_NAME).read_text(encoding="utf-8").strip()
+        except OSError:
+            return False
+        if not stamp or seed_stamp != stamp:
+            shutil.rmtree(CHROMIUM_PROFILE_SEED, ignore_errors=True)
+            return False
+        try:
+            shutil.copytree(CHROMIUM_PROFILE_SEED, user_data_dir, dirs_exist_ok=True)
+        except (OSError, shutil.Error):
+            return False
+        self.log("Using cached Chromium profile seed", "debug")
+        return True
+
+    def _save_profile_seed(self):
+        """Store the (closed) profile as the seed for the next run; first writer wins."""
+        stamp = self._build_stamp()
+        if not stamp or not self._user_data_dir or CHROMIUM_PROFILE_SEED.exists():
+            return
+        tmp = CHROMIUM_PROFILE_SEED.with_name(f"{CHROMIUM_PROFILE_SEED.name}.tmp-{os.getpid()}-{id(self)}")
+        try:
+            shutil.copytree(self._user_data_dir, tmp, ignore=_PROFILE_SEED_IGNORE)
+            (tmp / PROFILE_SEED_STAMP_NAME).write_text(stamp, encoding="utf-8")
+            tmp.rename(CHROMIUM_PROFILE_SEED)
+        except (OSError, shutil.Error):
+            pass
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+
     async def setup(self):
         """Set up Playwright with a browser and the extension."""
         if self.browser_name == "chromium":
@@ -88,29 +503,38 @@ class AutomatedExtensionTester:
 
         self._playwright = await async_playwright().start()
 
-        if self.browser_name == "chromium":
+        if self.browser_name == "chromium" and self.connect_url:
+            # Reuse the daemon's warm context; the extension there is whatever it was launched with.
+            self.log(f"Connecting to warm browser at {self.connect_url}", "info")
+            self._browser = await self._playwright.chromium.connect_over_cdp(self.connect_url)
+            self.context = self._browser.contexts[0]
+            self.page = await self.context.new_page()
+        elif self.browser_name == "chromium":
             if self.headless:
-                self.log("Chromium extension tests require headful mode; forcing headless=False", "warning")
-                self.headless = False
+                window_args = ["--headless=new"]
+            elif self.debug:
+                window_args = []
+            else:
+                # Keep the window off-screen unless explicitly debugging.
+                window_args = [
+                    "--window-position=-32000,-32000",
+                    "--window-size=800,600",
+                    "--start-minimized",
+                ]
 
             self._user_data_dir = Path(tempfile.mkdtemp(prefix="playwright-chromium-ext-"))
+            self._profile_seeded = self._seed_profile(self._user_data_dir)
             self.context = await self._playwright.chromium.launch_persistent_context(
                 user_data_dir=self._user_data_dir,
+                # Playwright's own headless mode uses the headless shell, which can't load
+                # extensions; --headless=new runs the full browser (MV3 included) without a window.
                 headless=False,
                 args=[
                     f"--disable-extensions-except={extension_path_str}",
                     f"--load-extension={extension_path_str}",
                     "--disable-features=ExtensionManifestV2Disabled",
-                    # Keep the window off-screen unless explicitly debugging.
-                    *(
-                        []
-                        if self.debug
-                        else [
-                            "--window-position=-32000,-32000",
-                            "--window-size=800,600",
-                            "--start-minimized",
-                        ]
-                    ),
+                    *([f"--remote-debugging-port={self._serve_port}"] if self._serve_port else []),
+                    *window_args,
                 ],
             )
         elif self.browser_name == "firefox":
@@ -126,11 +550,12 @@ class AutomatedExtensionTester:
             raise ValueError(f"Unsupported browser: {self.browser_name}")
         
         # Get or create page
-        pages = self.context.pages
-        if pages:
-            self.page = pages[0]
-        else:
-            self.page = await self.context.new_page()
+        if not self.page:
+            pages = self.context.pages
+            if pages:
+                self.page = pages[0]
+            else:
+                self.page = await self.context.new_page()
         
         self.log(f"{self.browser_name} launched with extension", "success")
 
@@ -140,142 +565,101 @@ class AutomatedExtensionTester:
                 self.service_worker = sws[0] if sws else None
             if not self.service_worker:
                 self.service_worker = await self.context.wait_for_event("serviceworker")
+            if self.verify_in_page:
+                await self.service_worker.evaluate(_JS_ENABLE_DEBUG_LOGS)
+
+    def _ensure_http_server(self) -> int:
+        """Start the localhost server for the examples once per tester and return its port."""
+        if self._httpd:
+            return self._httpd.server_address[1]
+        handler = lambda *a, **kw: _QuietHandler(*a, directory=str(PROJECT_ROOT), **kw)
+        # Parallel lanes share a pid, so walk forward from the base port; fall back to ephemeral.
+        for port in [*range(HTTP_PORT_BASE, HTTP_PORT_BASE + HTTP_PORT_ATTEMPTS), 0]:
+            try:
+                self._httpd = _TestHTTPServer(("127.0.0.1", port), handler)
+                break
+            except OSError:
+                continue
+        else:
+            raise RuntimeError("could not bind a localhost port for the test server")
+        self._http_thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._http_thread.start()
+        return self._httpd.server_address[1]
 
     async def load_test_page(self):
         """Load the test HTML page."""
         if self.browser_name == "chromium":
             # Chromium extensions don't reliably run on file:// without user toggles.
             # Serve the repo over localhost for predictable content-script injection.
-            handler = lambda *a, **kw: _QuietHandler(*a, directory=str(PROJECT_ROOT), **kw)
-            self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
-            port = self._httpd.server_address[1]
-            self._http_thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
-            self._http_thread.start()
-
+            port = self._ensure_http_server()
             rel = self.test_html.relative_to(PROJECT_ROOT).as_posix()
             url = f"http://127.0.0.1:{port}/{rel}"
-            self.log(f"Loading test page: {url}", "info")
-            await self.page.goto(url, wait_until="domcontentloaded")
         else:
-            file_url = f"file://{self.test_html.absolute()}"
-            self.log(f"Loading test page: {file_url}", "info")
-            await self.page.goto(file_url, wait_until="domcontentloaded")
+            url = self.test_html.absolute().as_uri()
+
+        if not self.force_reload and self.page.url == url:
+            # Same document as the previous case: clear selection/diag state instead of navigating.
+            if await self.page.evaluate(_JS_RESET_PAGE_STATE):
+                self.log(f"Reusing loaded test page: {url}", "debug")
+                return
+
+        # A new document gets its own content-script injection (at document_idle, after the
+        # DOMContentLoaded this method waits for), so its marker has to be seen again.
+        self._verified_url = None
+        self.log(f"Loading test page: {url}", "info")
+        await self.page.goto(url, wait_until="commit")
 
+        # goto() only waits for "commit"; the probe below awaits DOMContentLoaded in-page.
         # Prove the DOM is usable by mutating it and reading the mutation back.
         # This avoids "networkidle" hangs (e.g., analytics, CDN scripts, long polling).
-        await self.page.wait_for_selector("body", timeout=5000, state="attached")
-        await self.page.wait_for_function(
-            "() => document.readyState === 'interactive' || document.readyState === 'complete'",
-            timeout=5000,
-        )
-        probe_value = await self.page.evaluate(
-            """
-            () => {
-                const value = `${Date.now()}-${Math.random().toString(16).slice(2)}`;
-                let el = document.getElementById("__pw_dom_probe");
-                if (!el) {
-                    el = document.createElement("div");
-                    el.id = "__pw_dom_probe";
-                    el.style.display = "none";
-                    document.documentElement.appendChild(el);
-                }
-                el.textContent = value;
-                return value;
-            }
-            """
-        )
-        await self.page.wait_for_function(
-            """(expected) => document.getElementById("__pw_dom_probe")?.textContent === expected""",
-            arg=probe_value,
-            timeout=5000,
-        )
+        # Waiting for the DOM, writing the probe and reading it back happen in one round trip.
+        probe = await self.page.evaluate(_JS_DOM_PROBE)
+        if not probe or probe.get("read") != probe.get("written"):
+            raise RuntimeError(f"DOM probe mismatch after page load: {probe!r}")
+        if self.verify_in_page:
+            await self.page.evaluate(_JS_ENABLE_PAGE_DEBUG_LOGS)
         self.log("Test page loaded", "success")
 
     async def _chromium_send_to_active_tab(self, message: dict) -> dict | None:
         if self.browser_name != "chromium" or not self.service_worker:
             raise RuntimeError("chromium service worker unavailable")
-        return await self.service_worker.evaluate(
-            """
-            async ({ message }) => {
-                const chrome = globalThis.chrome;
-                if (!chrome?.tabs) throw new Error("chrome.tabs unavailable");
-                function call(fn, ...args) {
-                    return new Promise((resolve, reject) => {
-                        fn(...args, (result) => {
-                            const err = chrome.runtime?.lastError;
-                            if (err) reject(new Error(err.message || String(err)));
-                            else resolve(result);
-                        });
-                    });
-                }
-                const tabs = await call(chrome.tabs.query, { active: true, currentWindow: true });
-                const tabId = tabs && tabs[0] ? tabs[0].id : null;
-                if (!tabId) throw new Error("no active tab");
-                const resp = await call(chrome.tabs.sendMessage, tabId, message);
-                return resp || null;
-            }
-            """,
-            {"message": message},
-        )
+        return await self.service_worker.evaluate(_JS_SEND_TO_ACTIVE_TAB, {"message": message})
 
     async def verify_extension_loaded(self) -> bool:
         """Verify extension content script is loaded."""
+        if self._verified_url is not None and self._verified_url == self.page.url:
+            return True
         self.log("Verifying extension is loaded...", "info")
         
-        # Wait up to 0.5 seconds for extension to load
-        max_wait = 0.5
-        check_interval = 0.1
-        attempts = int(max_wait / check_interval)
-        
-        for attempt in range(attempts):
-            is_loaded = await self.page.evaluate("""
-                () => {
-                    return document.documentElement &&
-                           document.documentElement.dataset &&
-                           document.documentElement.dataset.copyOfficeFormatExtensionLoaded === "true";
-                }
-            """)
-            
-            if is_loaded:
-                self.log("Extension content script is active", "success")
-                return True
-            
-            if attempt < attempts - 1:
-                await asyncio.sleep(check_interval)
-        
-        # Extension not loaded - this means wrong setup
-        self.log("Extension content script not found (DOM marker missing)", "error")
-        self.log("  This indicates the extension is not properly loaded", "error")
-        self.log("  Check: extension loading flags and manifest compatibility", "error")
-        self.results["errors"].append("Extension content script not loaded - check extension loading")
-        return False
+        # Wait for the extension to load; the predicate is polled in-page.
+        try:
+            await self.page.wait_for_function(
+                _JS_EXTENSION_LOADED,
+                polling=self._EXT_MARKER_POLL_MS,
+                timeout=self._EXT_MARKER_TIMEOUT_MS,
+            )
+        except PlaywrightTimeoutError:
+            # Extension not loaded - this means wrong setup
+            self.log("Extension content script not found (DOM marker missing)", "error")
+            self.log("  This indicates the extension is not properly loaded", "error")
+            self.log("  Check: extension loading flags and manifest compatibility", "error")
+            self.results["errors"].append("Extension content script not loaded - check extension loading")
+            return False
+
+        self._verified_url = self.page.url
+        self.log("Extension content script is active", "success")
+        return True
 
     async def select_text_automatically(self, selector: str) -> str:
         """Automatically select text from an element."""
         self.log(f"Selecting text from: {selector}", "info")
         
-        # Wait for element to exist (max 0.5 seconds)
-        try:
-            await self.page.wait_for_selector(selector, timeout=2000, state="attached")
-        except Exception as e:
+        # Wait for the element (max 2 seconds) and select it in a single round-trip.
+        result = await self.page.evaluate(_JS_SELECT, {"selector": selector, "timeoutMs": 2000})
+        if not result.get("found"):
             self.log(f"Element not found: {selector}", "error")
-            self.log(f"  Error: {e}", "debug")
             return ""
-        
-        selected_text = await self.page.evaluate(f"""
-            (() => {{
-                const element = document.querySelector('{selector}');
-                if (!element) return '';
-                
-                const range = document.createRange();
-                range.selectNodeContents(element);
-                const selection = window.getSelection();
-                selection.removeAllRanges();
-                selection.addRange(range);
-                
-                return selection.toString();
-            }})();
-        """)
+        selected_text = result.get("text") or ""
         
         if selected_text:
             self.log(f"Selected {len(selected_text)} characters", "success")
@@ -289,29 +673,7 @@ class AutomatedExtensionTester:
         """Send message to active tab in Firefox."""
         if self.browser_name != "firefox":
             raise RuntimeError("firefox browser unavailable")
-        return await self.page.evaluate(
-            """
-            async ({ message }) => {
-                const browser = globalThis.browser || globalThis.chrome;
-                if (!browser?.tabs) throw new Error("browser.tabs unavailable");
-                function call(fn, ...args) {
-                    return new Promise((resolve, reject) => {
-                        fn(...args, (result) => {
-                            const err = browser.runtime?.lastError;
-                            if (err) reject(new Error(err.message || String(err)));
-                            else resolve(result);
-                        });
-                    });
-                }
-                const tabs = await call(browser.tabs.query, { active: true, currentWindow: true });
-                const tabId = tabs && tabs[0] ? tabs[0].id : null;
-                if (!tabId) throw new Error("no active tab");
-                const resp = await call(browser.tabs.sendMessage, tabId, message);
-                return resp || null;
-            }
-            """,
-            {"message": message},
-        )
+        return await self.page.evaluate(_JS_SEND_TO_ACTIVE_TAB, {"message": message})
 
     async def trigger_copy(self, mode: str = "html") -> bool:
         """Trigger copy through the real background -> content-script message path."""
@@ -341,9 +703,7 @@ class AutomatedExtensionTester:
                 self.log("Copy request completed", "success")
                 return True
             err = (resp or {}).get("error") if isinstance(resp, dict) else None
-            last_err = await self.page.evaluate(
-                "() => document.documentElement?.dataset?.copyOfficeFormatLastCopyError || ''"
-            )
+            last_err = await self.page.evaluate(_JS_LAST_COPY_ERROR)
             m = err or last_err or "unknown error"
             self.log(f"Copy request failed: {m}", "error")
             self.results["errors"].append(f"Copy failed: {m}")
@@ -353,6 +713,43 @@ class AutomatedExtensionTester:
             self.results["errors"].append(f"Copy trigger error: {str(e)}")
             return False
 
+    async def verify_copy_in_page(self, copy_mode: str = "html", expect_markdown: bool = False) -> dict:
+        """Verify the copy from the content script's diagnostics (no OS clipboard read).
+
+        With debug logs enabled, the content script records lengths and marker flags (OMML,
+        MathML, PARSE ERROR, Markdown) of the payload it wrote, never the text itself. The record
+        is per tab and cleared before each copy, so unlike the shared OS clipboard it cannot be
+        stale; no expected-token check is needed.
+        """
+        diag = await self.page.evaluate(_JS_COPY_DIAG, {"mode": copy_mode})
+        verification = _empty_verification()
+        write = diag.get("write") or {}
+        if diag.get("error"):
+            verification["error"] = f"copy reported error: {diag['error']}"
+            return verification
+        if copy_mode != "markdown-export" and diag.get("stage") != "done":
+            # markdown-export writes text directly and records no stages.
+            verification["error"] = f"copy pipeline stopped at stage {diag.get('stage') or '(none)'!r}"
+            return verification
+        if not write:
+            verification["error"] = "no clipboard write recorded by the content script"
+            return verification
+
+        html_len = int(write.get("htmlLen") or 0)
+        text_len = int(write.get("textLen") or 0)
+        verification["has_content"] = bool(html_len or text_len)
+        verification["has_html"] = html_len > 0
+        verification["has_plain_text"] = text_len > 0
+        verification["contains_omml"] = bool(write.get("omml"))
+        verification["contains_mathml"] = bool(write.get("mathml"))
+        verification["no_parse_error_markers"] = not write.get("parseError")
+        if expect_markdown and text_len:
+            # Same heuristic as check_clipboard_dump, evaluated in-page over the written text.
+            verification["is_markdown"] = bool(write.get("markdown"))
+        if copy_mode == "extract" and write.get("wordWrapped"):
+            verification["error"] = "extract mode should copy exact HTML fragment (not Word-wrapped HTML)"
+        return verification
+
     async def verify_clipboard_content(
         self,
         expected_token: str,
@@ -365,23 +762,13 @@ class AutomatedExtensionTester:
         """Verify OS clipboard content was updated by the extension."""
         self.log("Verifying OS clipboard content...", "info")
 
-        verification = {
-            "has_content": False,
-            "has_html": False,
-            "has_plain_text": False,
-            "contains_omml": False,
-            "contains_mathml": False,
-            "no_parse_error_markers": True,
-            "is_markdown": False,
-            "error": None,
-        }
+        verification = _empty_verification()
 
         if os.name != "nt":
             verification["error"] = "Windows-only clipboard verification skipped"
             return verification
 
         from tools.win_clipboard_dump import dump_clipboard  # type: ignore
-        import hashlib
 
         deadline_s = 15.0
         poll_s = 0.2
@@ -390,20 +777,20 @@ class AutomatedExtensionTester:
         while True:
             d = dump_clipboard()
             last = d
-            sha = d.get("cfhtml_bytes_sha256") or ""
-            plain = d.get("plain_text") or ""
-            plain_sha = hashlib.sha256(str(plain).encode("utf-8")).hexdigest() if plain is not None else ""
-
-            token_ok = bool(expected_token) and (str(expected_token).lower() in str(plain).lower())
+            plain = str(d.get("plain_text") or "")
 
             # Markdown/export modes may not update CF_HTML at all (text-only clipboard write),
             # so use plain-text change as the deterministic postcondition.
+            # Cheap change checks first; only lowercase the text once the clipboard has moved.
             if expect_markdown:
-                if plain and before_plain_sha and plain_sha != before_plain_sha and token_ok:
-                    break
+                changed = bool(plain) and bool(before_plain_sha) and (
+                    hashlib.sha256(plain.encode("utf-8")).hexdigest() != before_plain_sha
+                )
             else:
-                if sha and sha != before_sha and token_ok:
-                    break
+                sha = d.get("cfhtml_bytes_sha256") or ""
+                changed = bool(sha) and sha != before_sha
+            if changed and expected_token and expected_token.lower() in plain.lower():
+                break
             if asyncio.get_running_loop().time() - t0 >= deadline_s:
                 break
             await asyncio.sleep(poll_s)
@@ -412,77 +799,83 @@ class AutomatedExtensionTester:
             verification["error"] = "clipboard read failed"
             return verification
 
-        verification["has_content"] = True
-        plain_text = str(last.get("plain_text", ""))
-        if plain_text:
-            verification["has_plain_text"] = True
-
-        fragment = str(last.get("fragment", ""))
-        if fragment:
-            verification["has_html"] = True
-            low = fragment.lower()
-            if ("mso-element:omath" in low) or ("<m:omath" in low) or ("<m:omathpara" in low):
-                verification["contains_omml"] = True
-            if "http://www.w3.org/1998/Math/MathML" in low:
-                verification["contains_mathml"] = True
-            if "[PARSE ERROR:" in fragment:
-                verification["no_parse_error_markers"] = False
-        
-        # Extract mode now copies the selection HTML exactly; require HTML to be present.
-        if copy_mode == "extract":
-            if not fragment:
-                verification["error"] = "clipboard missing HTML fragment (extract mode)"
-                return verification
-            low = fragment.lstrip().lower()
-            # Ensure we didn't accidentally emit Word-wrapped Office HTML.
-            if low.startswith("<!doctype html") or "urn:schemas-microsoft-com:office:office" in low:
-                verification["error"] = "extract mode should copy exact HTML fragment (not Word-wrapped HTML)"
-                return verification
-        
-        # Check if markdown (plain text with markdown syntax).
-        if expect_markdown:
-            if plain_text:
-                markers = ["# ", "## ", "* ", "- ", "```", "`"]
-                if any(m in plain_text for m in markers) or ("\n" in plain_text and len(plain_text) > 50):
-                    verification["is_markdown"] = True
-
-        # For markdown export and extract, we expect plain text, not HTML
-        # So we should check plain text for the token, not require HTML
-        if expected_token:
-            if expect_markdown:
-                # For markdown/extract, check plain text only
-                # Be lenient - check if any part of the token appears, or if clipboard has content
-                if plain_text and (expected_token.lower() in plain_text.lower() or len(plain_text) > 50):
-                    # Token found or substantial content present - consider it successful
-                    pass
-                else:
-                    verification["error"] = "clipboard did not update with expected token"
-                    return verification
-            else:
-                # For HTML modes, check both plain text and HTML fragment
-                if expected_token not in plain_text and expected_token not in fragment:
-                    verification["error"] = "clipboard did not update with expected token"
-                    return verification
-
-        # For markdown selection mode, formulas might not always be present in the selection
-        # Only check for formulas if we're in HTML mode (not markdown selection) and expect_formulas is True
-        # Markdown selection mode converts markdown to HTML, so formulas should be present
-        if expect_formulas and copy_mode == "markdown":
-            # Markdown selection should convert markdown to Office HTML with formulas
-            # So we should still check for formulas
-            if not (verification["contains_omml"] or verification["contains_mathml"]):
-                # This might be OK if the selection doesn't contain formulas
-                # Don't fail, just log a warning
-                pass
-        elif expect_formulas and copy_mode != "extract" and not (verification["contains_omml"] or verification["contains_mathml"]):
-            verification["error"] = "clipboard missing OMML/MathML"
-            return verification
+        return check_clipboard_dump(
+            last,
+            expected_token=expected_token,
+            expect_formulas=expect_formulas,
+            expect_markdown=expect_markdown,
+            copy_mode=copy_mode,
+        )
 
-        if not verification["no_parse_error_markers"]:
-            verification["error"] = "clipboard contains PARSE ERROR markers"
-            return verification
+    @staticmethod
+    def _judge_verification(verification: dict, expect_formulas: bool, expect_markdown: bool, copy_mode: str) -> bool:
+        """Turn a verification dict into pass/fail, printing the first failing reason."""
+        passed = True
+        if verification.get("error"):
+            if "NotAllowedError" not in verification["error"] and "skipped" not in verification["error"]:
+                passed = False
+                print(f"✗ Clipboard error: {verification['error']}")
+        else:
+            if not verification["has_content"]:
+                passed = False
+                print("✗ Clipboard is empty")
+            elif not expect_markdown and copy_mode != "extract" and not verification["has_html"]:
+                # Extract mode and markdown export don't have HTML
+                passed = False
+                print("✗ Clipboard missing HTML content")
+            elif not verification.get("no_parse_error_markers", True):
+                passed = False
+                print("✗ Clipboard contains PARSE ERROR placeholders")
+            elif expect_formulas and not verification["contains_omml"] and not verification["contains_mathml"]:
+                passed = False
+                print("✗ Clipboard missing OMML/MathML (formulas not converted)")
+            elif expect_markdown and not verification["is_markdown"]:
+                passed = False
+                print("✗ Clipboard content is not markdown format")
+        return passed
 
-        return verification
+    def run_offline(self, dump_root: Path):
+        """Re-check saved clipboard dumps (<dump_root>/<case slug>/dump.json) without a browser."""
+        print("="*60)
+        print("OFFLINE CLIPBOARD VERIFICATION")
+        print(f"Dumps: {dump_root}")
+        print("="*60)
+
+        for case in self._selected_cases():
+            dump_path = dump_root / case.slug / "dump.json"
+            print(f"\nTEST: {case.name}")
+            self.results["tests_run"] += 1
+            if not dump_path.exists():
+                # A wrong or empty DIR must not pass vacuously.
+                self.log(f"TEST FAILED: {case.name}: {dump_path} not found", "error")
+                self.results["tests_failed"] += 1
+                self.results["errors"].append(f"{case.name}: missing dump {dump_path}")
+                continue
+            try:
+                dump = json.loads(dump_path.read_text(encoding="utf-8"))
+            except (OSError, ValueError) as e:
+                self.results["tests_failed"] += 1
+                self.results["errors"].append(f"{case.name}: unreadable dump ({e})")
+                continue
+
+            # The selection token isn't known offline; the content checks still apply.
+            verification = check_clipboard_dump(
+                dump,
+                expected_token="",
+                expect_formulas=case.expect_formulas,
+                expect_markdown=case.expect_markdown,
+                copy_mode=case.copy_mode,
+            )
+            if self._judge_verification(verification, case.expect_formulas, case.expect_markdown, case.copy_mode):
+                self.log(f"TEST PASSED: {case.name}", "success")
+                self.results["tests_passed"] += 1
+            else:
+                self.log(f"TEST FAILED: {case.name}", "error")
+                self.results["tests_failed"] += 1
+                if verification.get("error"):
+                    self.results["errors"].append(f"{case.name}: {verification['error']}")
+
+        self.print_summary()
 
     async def run_test(self, test_name: str, selector: str, expect_formulas: bool = False, copy_mode: str = "html", expect_markdown: bool = False, measure_performance: bool = False):
         """Run a single automated test."""
@@ -510,17 +903,7 @@ class AutomatedExtensionTester:
             # Measure WASM load time (first load)
             if measure_performance:
                 wasm_load_start = asyncio.get_event_loop().time()
-                wasm_loaded = await self.page.evaluate("""
-                    async () => {
-                        if (!window.__cof?.wasm) return false;
-                        try {
-                            await window.__cof.wasm.load();
-                            return true;
-                        } catch (e) {
-                            return false;
-                        }
-                    }
-                """)
+                wasm_loaded = await self.page.evaluate(_JS_WASM_LOAD)
                 wasm_load_time = asyncio.get_event_loop().time() - wasm_load_start
                 if wasm_loaded:
                     performance_metrics["wasm_load_time"] = wasm_load_time
@@ -549,10 +932,9 @@ class AutomatedExtensionTester:
             
             before_sha = ""
             before_plain_sha = ""
-            if os.name == "nt":
+            if os.name == "nt" and not self.verify_in_page:
                 try:
                     from tools.win_clipboard_dump import dump_clipboard  # type: ignore
-                    import hashlib
 
                     before = dump_clipboard()
                     before_sha = before.get("cfhtml_bytes_sha256") or ""
@@ -574,43 +956,24 @@ class AutomatedExtensionTester:
                 performance_metrics["copy_time"] = copy_time
             
             # Verify clipboard
-            verification = await self.verify_clipboard_content(
-                expected_token=token,
-                before_sha=before_sha,
-                before_plain_sha=before_plain_sha,
-                expect_formulas=expect_formulas,
-                expect_markdown=expect_markdown,
-                copy_mode=copy_mode,
-            )
+            if self.verify_in_page:
+                verification = await self.verify_copy_in_page(copy_mode, expect_markdown)
+            else:
+                verification = await self.verify_clipboard_content(
+                    expected_token=token,
+                    before_sha=before_sha,
+                    before_plain_sha=before_plain_sha,
+                    expect_formulas=expect_formulas,
+                    expect_markdown=expect_markdown,
+                    copy_mode=copy_mode,
+                )
             
             # Check results
-            passed = True
-            if verification.get("error"):
-                if "NotAllowedError" not in verification["error"] and "skipped" not in verification["error"]:
-                    passed = False
-                    print(f"✗ Clipboard error: {verification['error']}")
-            else:
-                if not verification["has_content"]:
-                    passed = False
-                    print("✗ Clipboard is empty")
-                elif not expect_markdown and copy_mode != "extract" and not verification["has_html"]:
-                    # Extract mode and markdown export don't have HTML
-                    passed = False
-                    print("✗ Clipboard missing HTML content")
-                elif not verification.get("no_parse_error_markers", True):
-                    passed = False
-                    print("✗ Clipboard contains PARSE ERROR placeholders")
-                elif expect_formulas and not verification["contains_omml"] and not verification["contains_mathml"]:
-                    passed = False
-                    print("✗ Clipboard missing OMML/MathML (formulas not converted)")
-                elif expect_markdown and not verification["is_markdown"]:
-                    passed = False
-                    print("✗ Clipboard content is not markdown format")
+            passed = self._judge_verification(verification, expect_formulas, expect_markdown, copy_mode)
             
             if passed:
                 self.log(f"TEST PASSED: {test_name}", "success")
                 if measure_performance and performance_metrics:
-                    import json
                     self.log(f"Performance metrics: {json.dumps(performance_metrics, indent=2)}", "debug")
                 self.results["tests_passed"] += 1
             else:
@@ -623,10 +986,96 @@ class AutomatedExtensionTester:
             print(f"\n❌ TEST ERROR: {test_name} - {e}")
             self.results["tests_failed"] += 1
             self.results["errors"].append(f"{test_name}: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            # Formatting a traceback walks frames and reads source; only pay for it when debugging.
+            if self.debug:
+                logger.exception("test error: %s", test_name)
             return False
 
+    async def run_case(self, case: CopyCase):
+        """Run one entry of COPY_CASES on this tester's page."""
+        self.test_html = case.html or self._default_test_html
+        return await self.run_test(
+            case.name,
+            case.selector,
+            expect_formulas=case.expect_formulas,
+            copy_mode=case.copy_mode,
+            expect_markdown=case.expect_markdown,
+            measure_performance=case.measure_performance,
+        )
+
+    def _selected_cases(self) -> list[CopyCase]:
+        cases = []
+        # Shard on position in COPY_CASES (before any skips) so every process agrees on the split.
+        for i, case in enumerate(COPY_CASES):
+            if i % self.shards != self.shard_id:
+                continue
+            if case.optional and case.html and not case.html.exists():
+                self.log(f"Skipping {case.name}: {case.html.name} not found", "warning")
+                continue
+            cases.append(case)
+        return cases
+
+    def _lane_count(self, n_cases: int) -> int:
+        """Number of independent browser contexts to run cases on."""
+        if self.parallel <= 1 or n_cases <= 1:
+            return 1
+        if self.debug:
+            self.log("--debug set; running tests sequentially", "warning")
+            return 1
+        if self.connect_url:
+            self.log("--connect shares one daemon context; running sequentially", "warning")
+            return 1
+        if self.browser_name != "chromium":
+            self.log("Parallel lanes need a per-lane profile (chromium only); running sequentially", "warning")
+            return 1
+        if os.name == "nt":
+            # The OS clipboard is a single shared postcondition; parallel copies would race on it.
+            self.log("OS clipboard is shared across lanes; verifying via in-page copy diagnostics", "warning")
+        return min(self.parallel, n_cases)
+
+    async def _run_lanes(self, cases: list[CopyCase], lanes: int):
+        """Run cases across `lanes` testers, each with its own persistent context."""
+        # Build once up front so lanes don't race on dist/chromium.
+        self._ensure_chromium_extension()
+
+        testers = [
+            AutomatedExtensionTester(
+                self.extension_path,
+                self._default_test_html,
+                browser_name=self.browser_name,
+                headless=self.headless,
+                debug=self.debug,
+                force_reload=self.force_reload,
+            )
+            for _ in range(lanes)
+        ]
+        for tester in testers:
+            tester.verify_in_page = os.name == "nt"
+
+        async def run_lane(tester: "AutomatedExtensionTester", batch: list[CopyCase]):
+            try:
+                await tester.setup()
+                for case in batch:
+                    await tester.run_case(case)
+            finally:
+                await tester.cleanup()
+
+        outcomes = await asyncio.gather(
+            *(run_lane(t, cases[i::lanes]) for i, t in enumerate(testers)),
+            return_exceptions=True,
+        )
+
+        # Each lane owns its results; merge once all lanes are done.
+        for i, (tester, outcome) in enumerate(zip(testers, outcomes)):
+            for key in ("tests_run", "tests_passed", "tests_failed"):
+                self.results[key] += tester.results[key]
+            self.results["errors"].extend(tester.results["errors"])
+            if isinstance(outcome, BaseException):
+                not_run = len(cases[i::lanes]) - tester.results["tests_run"]
+                self.results["tests_run"] += not_run
+                self.results["tests_failed"] += not_run
+                self.results["errors"].append(f"Lane {i} error: {outcome}")
+
     async def run_all_tests(self):
         """Run all automated tests."""
         print("="*60)
@@ -638,101 +1087,25 @@ class AutomatedExtensionTester:
         print("="*60)
         
         try:
-            await self.setup()
-            
-            # Test 1: Basic text selection
-            await self.run_test(
-                "Basic Text Selection",
-                "user-query-content:first-of-type",
-                expect_formulas=False
-            )
-            
-            # Test 2: Text with formulas
-            await self.run_test(
-                "Text with LaTeX Formulas",
-                "message-content:first-of-type",
-                expect_formulas=True
-            )
-            
-            # Test 3: Multiple messages
-            await self.run_test(
-                "Multiple Messages with Formulas",
-                "message-content:first-of-type, message-content:nth-of-type(2)",
-                expect_formulas=True
-            )
-
-            # Test 4: Forced Rust WASM conversion (no external renderer fallback)
-            original_test_html = self.test_html
-            try:
-                self.test_html = PROJECT_ROOT / "examples" / "force-wasm-latex-test.html"
-                await self.run_test(
-                    "Forced Rust WASM LaTeX Conversion",
-                    "#content",
-                    expect_formulas=True,
-                )
-                self.test_html = PROJECT_ROOT / "examples" / "force-wasm-unicode-math-test.html"
-                await self.run_test(
-                    "Forced Rust WASM Unicode Normalization",
-                    "#content",
-                    expect_formulas=True,
-                )
-            finally:
-                self.test_html = original_test_html
-
-            # Test 5: Copy as Markdown
-            original_test_html = self.test_html
-            try:
-                self.test_html = PROJECT_ROOT / "examples" / "selection_example_static.html"
-                await self.run_test(
-                    "Copy as Markdown",
-                    "#extended-response-markdown-content",
-                    expect_formulas=False,
-                    copy_mode="markdown-export",
-                    expect_markdown=True,
-                )
-            finally:
-                self.test_html = original_test_html
-
-            # Test 6: Copy Office Format from Markdown selection
-            # Note: This test may not always have formulas, so we don't require them
-            original_test_html = self.test_html
-            try:
-                self.test_html = PROJECT_ROOT / "examples" / "selection_example_static.html"
-                await self.run_test(
-                    "Copy Office Format from Markdown Selection",
-                    "#extended-response-markdown-content",
-                    expect_formulas=False,  # Don't require formulas for this test
-                    copy_mode="markdown",
-                )
-            finally:
-                self.test_html = original_test_html
-
-            # Test 7: Extract Selected HTML
-            self.test_html = PROJECT_ROOT / "examples" / "gemini-conversation-test.html"
-            await self.run_test(
-                "Extract Selected HTML",
-                "message-content:first-of-type",
-                expect_formulas=False,
-                copy_mode="extract",
-            )
-
-            # Test 8: Performance benchmark - Large selection
-            if (PROJECT_ROOT / "examples" / "test_large_selection.html").exists():
-                self.test_html = PROJECT_ROOT / "examples" / "test_large_selection.html"
-                await self.run_test(
-                    "Performance: Large Selection",
-                    "body",
-                    expect_formulas=False,
-                    measure_performance=True,
-                )
+            cases = self._selected_cases()
+            if self.shards > 1:
+                self.log(f"Shard {self.shard_id + 1}/{self.shards}: {len(cases)} of {len(COPY_CASES)} tests", "info")
+            lanes = self._lane_count(len(cases))
+            if lanes > 1:
+                self.log(f"Running {len(cases)} tests across {lanes} parallel contexts", "info")
+                await self._run_lanes(cases, lanes)
+            else:
+                await self.setup()
+                for case in cases:
+                    await self.run_case(case)
              
             # Print summary
             self.print_summary()
             
         except Exception as e:
             print(f"\n❌ Test suite error: {e}")
-            import traceback
-            traceback.print_exc()
+            if self.debug:
+                logger.exception("test suite error")
         finally:
             await self.cleanup()
 
@@ -760,11 +1133,36 @@ class AutomatedExtensionTester:
         
         print("="*60)
 
+    async def serve(self, port: int):
+        """Keep a warm Chromium + extension running for `--connect` runs until interrupted."""
+        self._serve_port = port
+        try:
+            await self.setup()
+            self.log(f"Serving warm Chromium; run tests with --connect http://127.0.0.1:{port}", "success")
+            self.log("Restart the daemon after changing extension sources. Ctrl+C to stop.", "info")
+            await asyncio.Event().wait()
+        finally:
+            await self.cleanup()
+
     async def cleanup(self):
         """Clean up resources."""
+        if self._browser:
+            # Attached to a `--serve` daemon: close only our tab and leave its context running.
+            try:
+                if self.page and not self.page.is_closed():
+                    await self.page.close()
+            except Exception:
+                pass
+            self.page = None
+            self.context = None
+            self._browser = None
+
         if self.context:
             await self.context.close()
             self.context = None
+            # Only a profile whose extension service worker came up is worth seeding.
+            if self.browser_name == "chromium" and self.service_worker and not self._profile_seeded:
+                self._save_profile_seed()
 
         if self._playwright:
             await self._playwright.stop()
@@ -794,7 +1192,29 @@ async def main():
                         help="Browser to use for automated testing (default: chromium)")
     parser.add_argument("--headless", action="store_true", help="Run in headless mode")
     parser.add_argument("--debug", action="store_true", help="Enable debug output")
+    parser.add_argument("--parallel", type=int, default=1, metavar="N",
+                        help="Run tests across N browser contexts concurrently (chromium, non-Windows; default: 1)")
+    parser.add_argument("--shards", type=int, default=1, metavar="N",
+                        help="Split the test list into N deterministic shards (run one process per shard)")
+    parser.add_argument("--shard-id", type=int, default=0, metavar="K",
+                        help="Which shard to run, 0 <= K < N (default: 0)")
+    parser.add_argument("--force-reload", action="store_true",
+                        help="Navigate for every test even when the previous test used the same page")
+    parser.add_argument("--offline", metavar="DIR",
+                        help="Skip the browser; re-check saved dumps at DIR/<case-slug>/dump.json. "
+                             "Produce one per case by copying it on Windows and then running "
+                             "tools/win_clipboard_dump.py --out-dir DIR/<case-slug> (slug: the case "
+                             "name lowercased, non-alphanumerics as '-'). A missing dump fails its case")
+    parser.add_argument("--serve", type=int, nargs="?", const=9333, default=None, metavar="PORT",
+                        help="Keep a warm Chromium + extension alive on a CDP port (default: 9333) and wait")
+    parser.add_argument("--connect", metavar="URL",
+                        help="Run tests against a --serve daemon (e.g. http://127.0.0.1:9333) instead of launching")
     args = parser.parse_args()
+    logging.basicConfig(level=logging.DEBUG if args.debug else logging.WARNING, format="%(levelname)s %(name)s: %(message)s")
+    if (args.serve is not None or args.connect) and args.browser != "chromium":
+        parser.error("--serve/--connect require --browser chromium")
+    if args.shards < 1 or not 0 <= args.shard_id < args.shards:
+        parser.error("--shard-id must satisfy 0 <= K < --shards")
     
     if not EXTENSION_PATH.exists():
         print(f"❌ Extension path not found: {EXTENSION_PATH}")
@@ -809,8 +1229,19 @@ async def main():
         TEST_HTML, 
         browser_name=args.browser,
         headless=args.headless,
-        debug=args.debug
+        debug=args.debug,
+        parallel=args.parallel,
+        shards=args.shards,
+        shard_id=args.shard_id,
+        connect_url=args.connect,
+        force_reload=args.force_reload,
     )
+    if args.offline:
+        tester.run_offline(Path(args.offline))
+        sys.exit(0 if tester.results["tests_failed"] == 0 else 1)
+    if args.serve is not None:
+        await tester.serve(args.serve)
+        return
     await tester.run_all_tests()
     
     # Exit with appropriate code
@@ -818,4 +1249,6 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    from tools.async_run import run  # type: ignore
+
+    run(main())
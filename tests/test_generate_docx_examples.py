@@ -346,7 +346,7 @@ async def main() -> int:
                 probe_value = await page.evaluate(
                     """
                     () => {
-                        const value = `${Date.now()}-${Math.random().toString(16).slice(2)}`;
+                        const value = String(window.__pwDomProbeSeq = (window.__pwDomProbeSeq || 0) + 1);
                         let el = document.getElementById("__pw_dom_probe");
                         if (!el) {
                             el = document.createElement("div");
@@ -8,12 +8,12 @@ Tests the browser action popup:
 - Storage persistence
 """
 
-import asyncio
 import argparse
 import json
 import sys
 import tempfile
 import shutil
+from dataclasses import dataclass, field
 from pathlib import Path
 from playwright.async_api import async_playwright, BrowserContext, Page
 
@@ -22,6 +22,45 @@ PROJECT_ROOT = Path(__file__).parent.parent
 EXTENSION_PATH = PROJECT_ROOT / "extension"
 CHROMIUM_EXTENSION_PATH = PROJECT_ROOT / "dist" / "chromium"
 
+# Resolves once storage holds `expected` (nested subset match). The onChanged
+# listener is attached before the initial read so a write landing in between
+# is not missed.
+_JS_WAIT_STORAGE_CONFIG = """
+async ({ expected, timeoutMs }) => {
+    const chrome = globalThis.chrome;
+    if (!chrome?.storage) return false;
+    const STORAGE_KEY = "gptLatexCtrlCVConfig";
+    const matches = (cfg, exp) => Object.entries(exp).every(([k, v]) =>
+        v && typeof v === "object" && !Array.isArray(v)
+            ? cfg && typeof cfg[k] === "object" && matches(cfg[k], v)
+            : cfg && cfg[k] === v);
+    return new Promise((resolve) => {
+        const done = (ok) => {
+            clearTimeout(timer);
+            chrome.storage.onChanged.removeListener(onChanged);
+            resolve(ok);
+        };
+        const onChanged = (changes, area) => {
+            if (area === "local" && changes[STORAGE_KEY] && matches(changes[STORAGE_KEY].newValue || {}, expected)) done(true);
+        };
+        const timer = setTimeout(() => done(false), timeoutMs);
+        chrome.storage.onChanged.addListener(onChanged);
+        chrome.storage.local.get(STORAGE_KEY, (result) => {
+            if (matches(result[STORAGE_KEY] || {}, expected)) done(true);
+        });
+    });
+}
+"""
+
+
+
+@dataclass(slots=True)
+class SuiteResults:
+    tests_run: int = 0
+    tests_passed: int = 0
+    tests_failed: int = 0
+    errors: list[str] = field(default_factory=list)
+
 
 class PopupTester:
     def __init__(self, extension_path: Path, browser_name: str = "chromium", headless: bool = False, debug: bool = False):
@@ -34,13 +73,9 @@ class PopupTester:
         self.page: Page = None
         self.popup_page: Page | None = None
         self.service_worker = None
-        self.results = {
-            "tests_run": 0,
-            "tests_passed": 0,
-            "tests_failed": 0,
-            "errors": []
-        }
+        self.results = SuiteResults()
         self._user_data_dir: Path | None = None
+        self._extension_id: str | None = None
 
     def log(self, message: str, level: str = "info"):
         """Log message with optional debug output."""
@@ -58,9 +93,9 @@ class PopupTester:
         print(f"{prefix} {message}")
 
     def _ensure_chromium_extension(self) -> Path:
-        """Build the Chromium MV3 extension dir."""
-        from tools.build_chromium_extension import build  # type: ignore
-        built = build(CHROMIUM_EXTENSION_PATH)
+        """Build the Chromium MV3 extension dir (skipped when the sources are unchanged)."""
+        from tools.build_chromium_extension import ensure_built  # type: ignore
+        built = ensure_built(CHROMIUM_EXTENSION_PATH)
         return built
 
     async def setup(self):
@@ -132,29 +167,26 @@ class PopupTester:
                 if not self.service_worker:
                     self.service_worker = await self.context.wait_for_event("serviceworker")
 
-                # MV3: derive extension ID from the service worker context.
-                extension_id = await self.service_worker.evaluate(
-                    """
-                    () => {
-                        const chrome = globalThis.chrome;
-                        if (!chrome?.runtime) return null;
-                        return chrome.runtime.id;
-                    }
-                    """
-                )
+                # MV3: derive extension ID from the service worker context (once per context).
+                if not self._extension_id:
+                    self._extension_id = await self.service_worker.evaluate(
+                        """
+                        () => {
+                            const chrome = globalThis.chrome;
+                            if (!chrome?.runtime) return null;
+                            return chrome.runtime.id;
+                        }
+                        """
+                    )
                 
-                if not extension_id:
+                if not self._extension_id:
                     self.log("Could not get extension ID", "error")
                     return False
                 
-                # Open popup
-                popup_url = f"chrome-extension://{extension_id}/popup.html"
-                if self.popup_page:
-                    try:
-                        await self.popup_page.close()
-                    except Exception:
-                        pass
-                self.popup_page = await self.context.new_page()
+                # Open popup; navigating the existing popup page gives each test a fresh document.
+                popup_url = f"chrome-extension://{self._extension_id}/popup.html"
+                if not self.popup_page or self.popup_page.is_closed():
+                    self.popup_page = await self.context.new_page()
                 await self.popup_page.goto(popup_url, wait_until="domcontentloaded")
                 self.log("Popup opened", "success")
                 return True
@@ -200,6 +232,14 @@ class PopupTester:
             )
         return False
 
+    async def wait_for_storage_config(self, expected: dict, timeout_ms: int = 5000) -> bool:
+        """Wait until storage contains the expected values (resolved by storage.onChanged)."""
+        if self.browser_name == "chromium" and self.service_worker:
+            return await self.service_worker.evaluate(
+                _JS_WAIT_STORAGE_CONFIG, {"expected": expected, "timeoutMs": timeout_ms}
+            )
+        return False
+
     async def verify_storage_config(self, expected: dict) -> bool:
         """Verify storage configuration matches expected values."""
         config = await self.get_storage_config()
@@ -225,25 +265,25 @@ class PopupTester:
         print(f"TEST: {test_name}")
         print(f"{'='*60}")
         
-        self.results["tests_run"] += 1
+        self.results.tests_run += 1
         
         try:
             passed = await test_func()
             
             if passed:
                 self.log(f"TEST PASSED: {test_name}", "success")
-                self.results["tests_passed"] += 1
+                self.results.tests_passed += 1
             else:
                 self.log(f"TEST FAILED: {test_name}", "error")
-                self.results["tests_failed"] += 1
-                self.results["errors"].append(f"{test_name}: Test failed")
+                self.results.tests_failed += 1
+                self.results.errors.append(f"{test_name}: Test failed")
             
             return passed
             
         except Exception as e:
             print(f"\n❌ TEST ERROR: {test_name} - {e}")
-            self.results["tests_failed"] += 1
-            self.results["errors"].append(f"{test_name}: {str(e)}")
+            self.results.tests_failed += 1
+            self.results.errors.append(f"{test_name}: {str(e)}")
             import traceback
             traceback.print_exc()
             return False
@@ -266,19 +306,17 @@ class PopupTester:
             
             # Toggle on
             await checkbox.click()
-            await asyncio.sleep(0.5)  # Wait for storage update
             
             # Verify storage updated
-            if not await self.verify_storage_config({"translation": {"enabled": True}}):
+            if not await self.wait_for_storage_config({"translation": {"enabled": True}}):
                 self.log("Storage not updated after enabling", "error")
                 return False
             
             # Toggle off
             await checkbox.click()
-            await asyncio.sleep(0.5)  # Wait for storage update
             
             # Verify storage updated
-            if not await self.verify_storage_config({"translation": {"enabled": False}}):
+            if not await self.wait_for_storage_config({"translation": {"enabled": False}}):
                 self.log("Storage not updated after disabling", "error")
                 return False
             
@@ -325,7 +363,7 @@ class PopupTester:
                 return False
 
             await select.select_option("de")
-            await asyncio.sleep(0.5)  # Wait for storage update
+            await self.wait_for_storage_config({"translation": {"defaultLanguage": "de"}})
 
             config = await self.get_storage_config()
             default_lang = config.get("translation", {}).get("defaultLanguage")
@@ -369,7 +407,7 @@ class PopupTester:
                 return False
 
             await select.select_option("microsoft-free")
-            await asyncio.sleep(0.5)  # Wait for storage update
+            await self.wait_for_storage_config({"translation": {"service": "microsoft-free"}})
 
             config = await self.get_storage_config()
             svc = config.get("translation", {}).get("service")
@@ -461,22 +499,22 @@ class PopupTester:
         print("\n" + "="*60)
         print("TEST SUMMARY")
         print("="*60)
-        print(f"Tests Run: {self.results['tests_run']}")
-        print(f"Tests Passed: {self.results['tests_passed']} ✅")
-        print(f"Tests Failed: {self.results['tests_failed']} ❌")
+        print(f"Tests Run: {self.results.tests_run}")
+        print(f"Tests Passed: {self.results.tests_passed} ✅")
+        print(f"Tests Failed: {self.results.tests_failed} ❌")
         
-        if self.results["errors"]:
-            print(f"\nErrors ({len(self.results['errors'])}):")
-            for error in self.results["errors"]:
+        if self.results.errors:
+            print(f"\nErrors ({len(self.results.errors)}):")
+            for error in self.results.errors:
                 print(f"  - {error}")
         
-        success_rate = (self.results["tests_passed"] / self.results["tests_run"] * 100) if self.results["tests_run"] > 0 else 0
+        success_rate = (self.results.tests_passed / self.results.tests_run * 100) if self.results.tests_run > 0 else 0
         print(f"\nSuccess Rate: {success_rate:.1f}%")
         
-        if self.results["tests_failed"] == 0:
+        if self.results.tests_failed == 0:
             print("\n🎉 ALL TESTS PASSED!")
         else:
-            print(f"\n⚠️  {self.results['tests_failed']} test(s) failed")
+            print(f"\n⚠️  {self.results.tests_failed} test(s) failed")
         
         print("="*60)
 
@@ -524,8 +562,10 @@ async def main():
     )
     await tester.run_all_tests()
     
-    sys.exit(0 if tester.results["tests_failed"] == 0 else 1)
+    sys.exit(0 if tester.results.tests_failed == 0 else 1)
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    from tools.async_run import run  # type: ignore
+
+    run(main())
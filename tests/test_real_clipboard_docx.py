@@ -52,6 +52,11 @@ _PREFERRED_SELECTORS: list[str] = [
     "body",
 ]
 
+# Used to reduce a CF_HTML fragment to plain text for the Word token (compiled once).
+_HTML_COMMENT_RE = re.compile(r"<!--.*?-->", re.DOTALL)
+_HTML_TAG_RE = re.compile(r"<[^>]+>")
+_WHITESPACE_RE = re.compile(r"\s+")
+
 
 def _write_json(path: Path, data: object) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
@@ -173,7 +178,7 @@ async def _dom_prove_ready(page) -> None:
     probe_value = await page.evaluate(
         """
         () => {
-            const value = `${Date.now()}-${Math.random().toString(16).slice(2)}`;
+            const value = String(window.__pwDomProbeSeq = (window.__pwDomProbeSeq || 0) + 1);
             let el = document.getElementById("__pw_dom_probe");
             if (!el) {
                 el = document.createElement("div");
@@ -512,9 +517,9 @@ async def main() -> int:
 
                             if not word_token:
                                 frag = str(clip.get("fragment", "")) or ""
-                                frag = re.sub(r"<!--.*?-->", " ", frag, flags=re.DOTALL)
-                                frag = re.sub(r"<[^>]+>", " ", frag)
-                                frag = re.sub(r"\\s+", " ", frag).strip()
+                                frag = _HTML_COMMENT_RE.sub(" ", frag)
+                                frag = _HTML_TAG_RE.sub(" ", frag)
+                                frag = _WHITESPACE_RE.sub(" ", frag).strip()
                                 if frag:
                                     word_token = frag[:64].strip() or None
                         except Exception:
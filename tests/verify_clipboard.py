@@ -25,16 +25,18 @@ def verify_clipboard():
         print(f"✓ Clipboard contains {len(clipboard_text)} characters")
         print(f"  Preview: {clipboard_text[:100]}...")
         
-        # Check for LaTeX formulas (should be converted, not present as raw LaTeX)
+        # Check for LaTeX formulas (should be converted, not present as raw LaTeX).
+        # Each pattern is paired with a literal it cannot match without, so plain
+        # substring checks skip the regex scans on text with no delimiters at all.
         latex_patterns = [
-            r'\$[^$]+\$',  # Inline math
-            r'\\\[.*?\\\]',  # Display math
-            r'\\\(.*?\\\)',  # Inline math (alternative)
+            ("$", r'\$[^$]+\$'),  # Inline math
+            ("\\[", r'\\\[.*?\\\]'),  # Display math
+            ("\\(", r'\\\(.*?\\\)'),  # Inline math (alternative)
         ]
         
         has_raw_latex = False
-        for pattern in latex_patterns:
-            if re.search(pattern, clipboard_text):
+        for needle, pattern in latex_patterns:
+            if needle in clipboard_text and re.search(pattern, clipboard_text):
                 has_raw_latex = True
                 print(f"⚠ Warning: Found raw LaTeX in clipboard: {pattern}")
         
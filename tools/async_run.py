@@ -0,0 +1,27 @@
+"""
+Entry-point runner for the Playwright suites.
+
+Uses uvloop when it is installed (not on Windows): its libuv loop makes the many small
+CDP awaits cheaper. Falls back to `asyncio.run` otherwise.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+from collections.abc import Coroutine
+from typing import Any, TypeVar
+
+
+T = TypeVar("T")
+
+
+def run(main: Coroutine[Any, Any, T]) -> T:
+    if sys.platform != "win32":
+        try:
+            import uvloop  # type: ignore
+        except ImportError:
+            pass
+        else:
+            return uvloop.run(main)
+    return asyncio.run(main)
@@ -235,7 +235,7 @@ def main() -> int:
 
         probe_token = driver.execute_script(
             """
-            const token = `${Date.now()}-${Math.random().toString(16).slice(2)}`;
+            const token = String(window.__bidiDomProbeSeq = (window.__bidiDomProbeSeq || 0) + 1);
             let el = document.getElementById("__bidi_dom_probe");
             if (!el) {
               el = document.createElement("div");
@@ -1,4 +1,6 @@
+import hashlib
 import json
+import os
 import shutil
 from pathlib import Path
 
@@ -8,6 +10,7 @@ EXTENSION_ROOT = PROJECT_ROOT / "extension"
 MANIFEST_SOURCE = EXTENSION_ROOT / "manifest.chromium.json"
 
 DEFAULT_OUT_DIR = PROJECT_ROOT / "dist" / "chromium"
+BUILD_STAMP_NAME = ".build_stamp"
 
 COPY_ITEMS = [
     "background.js",
@@ -58,6 +61,63 @@ def build(out_dir: Path = DEFAULT_OUT_DIR) -> Path:
     return out_dir
 
 
+def hash_sources(root: Path) -> str:
+    """Digest of (relpath, mtime_ns, size) for every file under `root` plus this script.
+
+    Unlike a max-mtime check this also notices deleted files and files restored
+    with an older mtime (e.g. by a git checkout).
+    """
+    h = hashlib.blake2b(digest_size=16)
+    script = os.stat(__file__)
+    h.update(f"{Path(__file__).name}\0{script.st_mtime_ns}\0{script.st_size}\n".encode("utf-8"))
+    stack = [root]
+    entries = []
+    while stack:
+        with os.scandir(stack.pop()) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(Path(entry.path))
+                elif entry.is_file():
+                    st = entry.stat()
+                    rel = Path(entry.path).relative_to(root).as_posix()
+                    entries.append(f"{rel}\0{st.st_mtime_ns}\0{st.st_size}\n")
+    # scandir order is filesystem-dependent; sort so the digest is stable.
+    for line in sorted(entries):
+        h.update(line.encode("utf-8"))
+    return h.hexdigest()
+
+
+def ensure_built(out_dir: Path = DEFAULT_OUT_DIR) -> Path:
+    """Build only when the extension sources changed since the last build stamp."""
+    out_dir = out_dir.resolve()
+    stamp = out_dir / BUILD_STAMP_NAME
+    digest = hash_sources(EXTENSION_ROOT)
+    try:
+        if stamp.read_text(encoding="utf-8").strip() == digest:
+            return out_dir
+    except OSError:
+        pass
+
+    built = build(out_dir)
+    stamp.write_text(digest, encoding="utf-8")
+    return built
+
+
 if __name__ == "__main__":
-    built = build()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build the Chromium MV3 test bundle (dist/chromium).")
+    parser.add_argument(
+        "--if-changed",
+        action="store_true",
+        help="Skip the copy when the sources match the last build stamp (as the Playwright suites do).",
+    )
+    args = parser.parse_args()
+    if args.if_changed:
+        built = ensure_built()
+    else:
+        digest = hash_sources(EXTENSION_ROOT)
+        built = build()
+        # Record the stamp so the suites' ensure_built() doesn't redo this build.
+        (built / BUILD_STAMP_NAME).write_text(digest, encoding="utf-8")
     print(str(built))
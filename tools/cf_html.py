@@ -35,6 +35,8 @@ _END_MARKERS = (
     b"<!--EndFragment-->",
     b"<!--EndFragment -->",
 )
+# All four marker variants in one pattern, so the HTML region is scanned once.
+_MARKERS_RE = re.compile(rb"<!--(Start|End)Fragment ?-->")
 
 
 @dataclasses.dataclass(frozen=True)
@@ -67,20 +69,25 @@ def parse_offsets_from_bytes(data: bytes) -> CfHtmlOffsets:
     return CfHtmlOffsets(offsets=found)
 
 
-def _find_all(haystack: bytes, needle: bytes, *, start: int, end: int, max_hits: int) -> tuple[list[int], bool]:
-    hits: list[int] = []
-    pos = start
-    truncated = False
-    while True:
-        i = haystack.find(needle, pos, end)
-        if i < 0:
+def _find_markers(data: bytes, *, start: int, end: int, max_hits: int) -> tuple[list[int], bool, list[int], bool]:
+    """Start/End fragment marker positions in data[start:end], at most `max_hits` of each kind."""
+    start_hits: list[int] = []
+    end_hits: list[int] = []
+    start_truncated = end_truncated = False
+    for m in _MARKERS_RE.finditer(data, start, end):
+        if m.group(1) == b"Start":
+            if len(start_hits) < max_hits:
+                start_hits.append(m.start())
+            else:
+                start_truncated = True
+        else:
+            if len(end_hits) < max_hits:
+                end_hits.append(m.start())
+            else:
+                end_truncated = True
+        if start_truncated and end_truncated:
             break
-        hits.append(i)
-        pos = i + len(needle)
-        if len(hits) >= max_hits:
-            truncated = True
-            break
-    return hits, truncated
+    return start_hits, start_truncated, end_hits, end_truncated
 
 
 def validate_cf_html_bytes(data_raw: bytes, *, max_marker_positions: int = 10) -> dict[str, Any]:
@@ -142,21 +149,9 @@ def validate_cf_html_bytes(data_raw: bytes, *, max_marker_positions: int = 10) -
     derived: dict[str, Any] = {}
     if 0 <= start_html < end_html <= len(data):
         html_region = (start_html, end_html)
-        start_hits: list[int] = []
-        start_truncated = False
-        for m in _START_MARKERS:
-            hits, trunc = _find_all(data, m, start=start_html, end=end_html, max_hits=max_marker_positions)
-            start_hits.extend(hits)
-            start_truncated = start_truncated or trunc
-        start_hits = sorted(set(start_hits))
-
-        end_hits: list[int] = []
-        end_truncated = False
-        for m in _END_MARKERS:
-            hits, trunc = _find_all(data, m, start=start_html, end=end_html, max_hits=max_marker_positions)
-            end_hits.extend(hits)
-            end_truncated = end_truncated or trunc
-        end_hits = sorted(set(end_hits))
+        start_hits, start_truncated, end_hits, end_truncated = _find_markers(
+            data, start=start_html, end=end_html, max_hits=max_marker_positions
+        )
 
         markers = {
             "start_marker_positions": start_hits,
@@ -15,6 +15,7 @@ import argparse
 import hashlib
 import json
 import os
+import re
 import time
 from pathlib import Path
 from typing import Any
@@ -24,6 +25,9 @@ from ctypes import wintypes
 
 from tools.cf_html import parse_offsets_from_bytes, validate_cf_html_bytes  # type: ignore
 
+_START_MARKER_CI_RE = re.compile(rb"<!--startfragment", re.IGNORECASE)
+_END_MARKER_CI_RE = re.compile(rb"<!--endfragment", re.IGNORECASE)
+
 GMEM_MOVEABLE = 0x0002
 CF_UNICODETEXT = 13
 
@@ -122,28 +126,29 @@ def _parse_cf_html_bytes(raw: bytes) -> dict[str, Any]:
     ):
         frag_bytes = raw[start_frag:end_frag]
         # If offsets include comment markers, strip a single layer (best-effort).
-        low = frag_bytes.lower()
-        if low.startswith(b"<!--startfragment"):
-            j = low.find(b"-->")
+        # Only the ends can hold them, so lowercase just those instead of copying the fragment.
+        if frag_bytes[:32].lower().startswith(b"<!--startfragment"):
+            j = frag_bytes.find(b"-->")
             if j >= 0:
                 frag_bytes = frag_bytes[j + 3 :]
-        low = frag_bytes.lower()
-        if low.endswith(b"-->") and b"<!--endfragment" in low[-80:]:
-            k = low.rfind(b"<!--endfragment")
+        tail = frag_bytes[-80:].lower()
+        if tail.endswith(b"-->"):
+            k = tail.rfind(b"<!--endfragment")
             if k >= 0:
-                frag_bytes = frag_bytes[:k]
+                frag_bytes = frag_bytes[: len(frag_bytes) - len(tail) + k]
         out["header"] = header_bytes.decode("utf-8", errors="replace") if header_bytes else ""
         out["html"] = html_bytes.decode("utf-8", errors="replace")
         out["fragment"] = frag_bytes.decode("utf-8", errors="replace")
         return out
 
     # Fallback: marker-based extraction within the HTML payload (best-effort).
-    lower = html_bytes.lower()
-    start_pos = lower.find(b"<!--startfragment")
-    if start_pos >= 0:
-        start_end = lower.find(b"-->", start_pos)
+    # Case-insensitive regex search instead of lowercasing a copy of the whole payload.
+    m_start = _START_MARKER_CI_RE.search(html_bytes)
+    if m_start:
+        start_end = html_bytes.find(b"-->", m_start.start())
         if start_end >= 0:
-            end_pos = lower.find(b"<!--endfragment", start_end + 3)
+            m_end = _END_MARKER_CI_RE.search(html_bytes, start_end + 3)
+            end_pos = m_end.start() if m_end else -1
             if end_pos >= 0:
                 out["header"] = header_bytes.decode("utf-8", errors="replace") if header_bytes else ""
                 out["html"] = html_bytes.decode("utf-8", errors="replace")
@@ -194,15 +199,9 @@ def dump_clipboard() -> dict[str, Any]:
         plain_text = ""
         if raw_text is not None:
             # UTF-16LE with a trailing NUL (terminated on a 2-byte boundary).
-            b = raw_text
-            end = None
-            for i in range(0, max(0, len(b) - 1), 2):
-                if b[i] == 0 and b[i + 1] == 0:
-                    end = i
-                    break
-            if end is None:
-                end = len(b) - (len(b) % 2)
-            plain_text = b[:end].decode("utf-16le", errors="replace")
+            # Decode in one codec call; an aligned 00 00 unit decodes to exactly U+0000.
+            b = raw_text[: len(raw_text) - (len(raw_text) % 2)]
+            plain_text = b.decode("utf-16le", errors="replace").split("\x00", 1)[0]
 
         parsed = _parse_cf_html_bytes(html_bytes)
         validation = validate_cf_html_bytes(html_bytes) if html_bytes else {"ok": False, "errors": ["no HTML Format bytes"]}
@@ -132,13 +132,16 @@ def normalize_cfhtml_utf8(cfhtml: str) -> str:
     )
 
     def blen(s: str) -> int:
-        return len(s.encode("utf-8"))
+        # ASCII text (the usual header, often the fragment) is one byte per char: no encode copy.
+        return len(s) if s.isascii() else len(s.encode("utf-8"))
 
+    # The markers are ASCII, so only the header (SourceURL may be non-ASCII) and the fragment
+    # need encoding to measure, and the (possibly large) fragment is encoded just once.
     header_bytes = blen(header)
     start_html = header_bytes
-    start_fragment = start_html + blen(start_marker)
+    start_fragment = start_html + len(start_marker)
     end_fragment = start_fragment + blen(full_html)
-    end_html = start_html + blen(html)
+    end_html = end_fragment + len(end_marker)
 
     def pad(n: int) -> str:
         return str(n).rjust(10, "0")